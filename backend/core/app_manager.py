@@ -4,13 +4,22 @@ App Manager - Module Registration and Lifecycle Management
 Handles all application modules like FileOrganizer, FinancialManager, etc.
 """
 
+import importlib
 import logging
+from functools import lru_cache
 from typing import Dict, Optional, Any, List
 from datetime import datetime
 
 logger = logging.getLogger('AppManager')
 
 
+@lru_cache(maxsize=None)
+def _resolve_module_class(class_path: str):
+    """Resolve a dotted 'package.module.ClassName' path to the class object"""
+    module_path, class_name = class_path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_path), class_name)
+
+
 class AppManager:
     """
     Centralized application module manager
@@ -35,6 +44,9 @@ class AppManager:
         # Active (started) module instances
         self.active_modules: Dict[str, object] = {}
         
+        # Immutable per-module listing fields, built once at registration
+        self._module_static_info: Dict[str, Dict[str, Any]] = {}
+        
         # Module startup order and dependencies
         self.module_registry = {
             'file_organizer': {
@@ -131,10 +143,8 @@ class AppManager:
     async def _register_module(self, module_name: str, config: Dict[str, Any]):
         """Register a single module"""
         try:
-            # Import the module class dynamically
-            module_path, class_name = config['class_path'].rsplit('.', 1)
-            module = __import__(module_path, fromlist=[class_name])
-            module_class = getattr(module, class_name)
+            # Import the module class dynamically (cached per class_path)
+            module_class = _resolve_module_class(config['class_path'])
             
             # Prepare dependencies
             dependencies = self._prepare_dependencies(config.get('dependencies', []))
@@ -143,12 +153,26 @@ class AppManager:
             instance = module_class(**dependencies)
             
             # Store in registry
+            registered_at = datetime.now()
             self.registered_modules[module_name] = {
                 'instance': instance,
                 'config': config,
-                'registered_at': datetime.now(),
+                'registered_at': registered_at,
                 'started': False,
-                'start_count': 0
+                'start_count': 0,
+                # Lifecycle hooks the instance provides, probed once here
+                'caps': {
+                    'start': callable(getattr(instance, 'start', None)),
+                    'shutdown': callable(getattr(instance, 'shutdown', None)),
+                    'stop': callable(getattr(instance, 'stop', None)),
+                    'health_check': callable(getattr(instance, 'health_check', None))
+                }
+            }
+            self._module_static_info[module_name] = {
+                'description': config.get('description', ''),
+                'version': config.get('version', '1.0.0'),
+                'registered_at': registered_at.isoformat(),
+                'dependencies': config.get('dependencies', [])
             }
             
         except ImportError as e:
@@ -198,13 +222,16 @@ class AppManager:
             instance = module_info['instance']
             
             # Call start() method if available
-            if hasattr(instance, 'start'):
+            if module_info['caps']['start']:
                 await instance.start()
             
             # Update tracking
+            now = datetime.now()
+            now_iso = now.isoformat()
             module_info['started'] = True
             module_info['start_count'] += 1
-            module_info['last_started'] = datetime.now()
+            module_info['last_started'] = now
+            module_info['last_started_iso'] = now_iso
             
             # Add to active modules
             self.active_modules[module_name] = instance
@@ -212,7 +239,7 @@ class AppManager:
             # Emit event
             await self.event_bus.emit('module_started', {
                 'module': module_name,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now_iso
             })
             
             logger.info(f"✅ Module {module_name} started successfully")
@@ -246,14 +273,16 @@ class AppManager:
             instance = module_info['instance']
             
             # Call shutdown/stop method if available
-            if hasattr(instance, 'shutdown'):
+            caps = module_info['caps']
+            if caps['shutdown']:
                 await instance.shutdown()
-            elif hasattr(instance, 'stop'):
+            elif caps['stop']:
                 await instance.stop()
             
             # Update tracking
+            now = datetime.now()
             module_info['started'] = False
-            module_info['last_stopped'] = datetime.now()
+            module_info['last_stopped'] = now
             
             # Remove from active modules
             if module_name in self.active_modules:
@@ -262,7 +291,7 @@ class AppManager:
             # Emit event
             await self.event_bus.emit('module_stopped', {
                 'module': module_name,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now.isoformat()
             })
             
             logger.info(f"✅ Module {module_name} stopped")
@@ -289,16 +318,13 @@ class AppManager:
         
         for module_name, info in self.registered_modules.items():
             modules[module_name] = {
-                'description': info['config'].get('description', ''),
-                'version': info['config'].get('version', '1.0.0'),
+                **self._module_static_info[module_name],
                 'started': info['started'],
-                'start_count': info['start_count'],
-                'registered_at': info['registered_at'].isoformat(),
-                'dependencies': info['config'].get('dependencies', [])
+                'start_count': info['start_count']
             }
             
             if info['started']:
-                modules[module_name]['last_started'] = info.get('last_started', '').isoformat() if info.get('last_started') else ''
+                modules[module_name]['last_started'] = info.get('last_started_iso', '')
         
         return {
             'total_modules': len(self.registered_modules),
@@ -340,10 +366,9 @@ class AppManager:
             
             # Check module health if it has a health_check method
             if info['started']:
-                instance = info['instance']
-                if hasattr(instance, 'health_check'):
+                if info['caps']['health_check']:
                     try:
-                        module_health.update(await instance.health_check())
+                        module_health.update(await info['instance'].health_check())
                     except Exception as e:
                         module_health['health_check_error'] = str(e)
                         health['status'] = 'degraded'
@@ -4,15 +4,24 @@ Client Manager - WebSocket Connection Management
 Handles frontend connections, user sessions, and module lifecycle
 """
 
+import asyncio
+import itertools
 import logging
-import uuid
+import secrets
 from datetime import datetime
-from typing import Dict, Optional, Set
+from typing import Dict, Optional, Set, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
 logger = logging.getLogger('ClientManager')
 
+# Session IDs only need to be unique within this process
+_SESSION_ID_PREFIX = secrets.token_hex(4)
+_session_counter = itertools.count(1)
+
+# Sessions disconnected concurrently per batch during shutdown
+_SHUTDOWN_BATCH_SIZE = 512
+
 
 class AppModule(Enum):
     """Available application modules"""
@@ -21,7 +30,14 @@ class AppModule(Enum):
     FINANCIAL_MANAGER = "financial_manager"
 
 
-@dataclass
+# Enum member -> string value, avoiding the Enum .value descriptor on hot paths
+_MODULE_VALUES: Dict[AppModule, str] = {module: module.value for module in AppModule}
+
+# Returned to every connecting client
+_AVAILABLE_MODULES: Tuple[str, ...] = tuple(_MODULE_VALUES.values())
+
+
+@dataclass(slots=True)
 class UserSession:
     """User session data"""
     session_id: str
@@ -33,6 +49,19 @@ class UserSession:
     user_credentials: Optional[Dict] = None
 
 
+def _user_room(user_id: str) -> str:
+    """SocketIO room shared by all sockets of a user"""
+    return f"user:{user_id}"
+
+
+_MODULE_ROOMS: Dict[AppModule, str] = {module: f"module:{value}" for module, value in _MODULE_VALUES.items()}
+
+
+def _module_room(module: AppModule) -> str:
+    """SocketIO room shared by all sockets currently in a module"""
+    return _MODULE_ROOMS[module]
+
+
 class ClientManager:
     """
     Manages frontend connections and user sessions
@@ -49,6 +78,8 @@ class ClientManager:
         self.app_manager = None
         self.sessions: Dict[str, UserSession] = {}  # socket_id -> UserSession
         self.user_sessions: Dict[str, Set[str]] = {}  # user_id -> set of socket_ids
+        self.module_sessions: Dict[AppModule, Set[str]] = {module: set() for module in AppModule}  # module -> set of socket_ids
+        self._shutting_down = False
         
         logger.info("🔌 Client Manager initialized")
     
@@ -58,8 +89,11 @@ class ClientManager:
     
     async def handle_connect(self, socket_id: str, auth_data: Optional[Dict] = None):
         """Handle new WebSocket connection"""
+        if self._shutting_down:
+            return {'success': False, 'error': 'Server is shutting down'}
+        
         try:
-            session_id = str(uuid.uuid4())
+            session_id = f"{_SESSION_ID_PREFIX}-{next(_session_counter):x}"
             now = datetime.now()
             
             # Create new session
@@ -74,6 +108,8 @@ class ClientManager:
             )
             
             self.sessions[socket_id] = session
+            self.module_sessions[session.current_module].add(socket_id)
+            self.event_bus.enter_room(socket_id, _module_room(session.current_module))
             
             logger.info(f"🔌 New connection: {socket_id} (session: {session_id})")
             
@@ -87,7 +123,7 @@ class ClientManager:
             return {
                 'success': True,
                 'session_id': session_id,
-                'available_modules': [module.value for module in AppModule]
+                'available_modules': _AVAILABLE_MODULES
             }
             
         except Exception as e:
@@ -112,7 +148,9 @@ class ClientManager:
                     del self.user_sessions[session.user_id]
             
             # Remove session
+            self.module_sessions[session.current_module].discard(socket_id)
             del self.sessions[socket_id]
+            now = datetime.now()
             
             logger.info(f"🔌 Disconnected: {socket_id} (user: {session.user_id})")
             
@@ -121,8 +159,8 @@ class ClientManager:
                 'socket_id': socket_id,
                 'session_id': session.session_id,
                 'user_id': session.user_id,
-                'module': session.current_module.value,
-                'timestamp': datetime.now().isoformat()
+                'module': _MODULE_VALUES[session.current_module],
+                'timestamp': now.isoformat()
             })
             
         except Exception as e:
@@ -140,14 +178,16 @@ class ClientManager:
             # TODO: Implement proper authentication
             user_id = credentials.get('user_id', f"user_{socket_id[:8]}")
             
+            now = datetime.now()
             session.user_id = user_id
             session.user_credentials = credentials
-            session.last_activity = datetime.now()
+            session.last_activity = now
             
             # Track user sessions
             if user_id not in self.user_sessions:
                 self.user_sessions[user_id] = set()
             self.user_sessions[user_id].add(socket_id)
+            self.event_bus.enter_room(socket_id, _user_room(user_id))
             
             logger.info(f"🔐 User authenticated: {user_id} (socket: {socket_id})")
             
@@ -156,7 +196,7 @@ class ClientManager:
                 'user_id': user_id,
                 'socket_id': socket_id,
                 'session_id': session.session_id,
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now.isoformat()
             })
             
             return {
@@ -193,30 +233,38 @@ class ClientManager:
                     'session_id': session.session_id
                 })
 
-            # Clean up old module
-            await self._cleanup_user_module(session)
-            
             # Switch to new module
+            now = datetime.now()
+            self.module_sessions[old_module].discard(socket_id)
+            self.module_sessions[new_module_enum].add(socket_id)
+            self.event_bus.leave_room(socket_id, _module_room(old_module))
+            self.event_bus.enter_room(socket_id, _module_room(new_module_enum))
             session.current_module = new_module_enum
-            session.last_activity = datetime.now()
-            
-            # Initialize new module
-            await self._initialize_user_module(session)
-            
-            logger.info(f"🔄 Module switch: {session.user_id} {old_module.value} → {new_module}")
-            
-            # Emit module switch event
-            await self.event_bus.emit('module_switched', {
+            session.last_activity = now
+            
+            logger.info(f"🔄 Module switch: {session.user_id} {_MODULE_VALUES[old_module]} → {new_module}")
+            
+            # Clean up old module, initialize new module and announce the switch
+            # (emit_many keeps this order: leaving, joining, switched)
+            events = [
+                event for event in (
+                    self._module_leaving_event(session, old_module),
+                    self._module_joining_event(session, new_module_enum)
+                )
+                if event
+            ]
+            events.append(('module_switched', {
                 'user_id': session.user_id,
                 'socket_id': socket_id,
-                'old_module': old_module.value,
+                'old_module': _MODULE_VALUES[old_module],
                 'new_module': new_module,
-                'timestamp': datetime.now().isoformat()
-            })
+                'timestamp': now.isoformat()
+            }))
+            await self.event_bus.emit_many(events)
             
             return {
                 'success': True,
-                'old_module': old_module.value,
+                'old_module': _MODULE_VALUES[old_module],
                 'new_module': new_module,
                 'user_id': session.user_id
             }
@@ -225,77 +273,65 @@ class ClientManager:
             logger.error(f"❌ Module switch error for {socket_id}: {e}")
             return {'success': False, 'error': str(e)}
     
+    def _module_leaving_event(self, session: UserSession, module: AppModule) -> Optional[Tuple[str, Dict]]:
+        """Build the '<module>_user_leaving' event for a session leaving module"""
+        if module == AppModule.FILE_ORGANIZER:
+            event_type = 'file_organizer_user_leaving'
+        elif module == AppModule.FINANCIAL_MANAGER:
+            event_type = 'financial_manager_user_leaving'
+        else:
+            return None
+        
+        return event_type, {
+            'user_id': session.user_id,
+            'socket_id': session.socket_id,
+            'session_id': session.session_id
+        }
+    
+    def _module_joining_event(self, session: UserSession, module: AppModule) -> Optional[Tuple[str, Dict]]:
+        """Build the '<module>_user_joining' event for a session entering module"""
+        if module == AppModule.FILE_ORGANIZER:
+            event_type = 'file_organizer_user_joining'
+        elif module == AppModule.FINANCIAL_MANAGER:
+            event_type = 'financial_manager_user_joining'
+        else:
+            return None
+        
+        return event_type, {
+            'user_id': session.user_id,
+            'socket_id': session.socket_id,
+            'session_id': session.session_id,
+            'credentials': session.user_credentials
+        }
+    
     async def _cleanup_user_module(self, session: UserSession):
         """Clean up resources for user's current module"""
         try:
-            if session.current_module == AppModule.FILE_ORGANIZER:
-                await self.event_bus.emit('file_organizer_user_leaving', {
-                    'user_id': session.user_id,
-                    'socket_id': session.socket_id,
-                    'session_id': session.session_id
-                })
-            elif session.current_module == AppModule.FINANCIAL_MANAGER:
-                await self.event_bus.emit('financial_manager_user_leaving', {
-                    'user_id': session.user_id,
-                    'socket_id': session.socket_id,
-                    'session_id': session.session_id
-                })
+            leaving_event = self._module_leaving_event(session, session.current_module)
+            if leaving_event:
+                await self.event_bus.emit(*leaving_event)
             
-            logger.debug(f"🧹 Cleaned up {session.current_module.value} for user {session.user_id}")
+            logger.debug(f"🧹 Cleaned up {_MODULE_VALUES[session.current_module]} for user {session.user_id}")
             
         except Exception as e:
             logger.error(f"❌ Module cleanup error: {e}")
     
-    async def _initialize_user_module(self, session: UserSession):
-        """Initialize resources for user's new module"""
-        try:
-            if session.current_module == AppModule.FILE_ORGANIZER:
-                await self.event_bus.emit('file_organizer_user_joining', {
-                    'user_id': session.user_id,
-                    'socket_id': session.socket_id,
-                    'session_id': session.session_id,
-                    'credentials': session.user_credentials
-                })
-            elif session.current_module == AppModule.FINANCIAL_MANAGER:
-                await self.event_bus.emit('financial_manager_user_joining', {
-                    'user_id': session.user_id,
-                    'socket_id': session.socket_id,
-                    'session_id': session.session_id,
-                    'credentials': session.user_credentials
-                })
-            
-            logger.debug(f"🚀 Initialized {session.current_module.value} for user {session.user_id}")
-            
-        except Exception as e:
-            logger.error(f"❌ Module initialization error: {e}")
-    
     async def broadcast_to_user(self, user_id: str, event: str, data: Dict):
         """Send event to all sessions of a specific user"""
         if user_id not in self.user_sessions:
             return False
         
-        success_count = 0
-        for socket_id in self.user_sessions[user_id]:
-            try:
-                await self.event_bus.emit_to_socket(socket_id, event, data)
-                success_count += 1
-            except Exception as e:
-                logger.error(f"❌ Failed to send to {socket_id}: {e}")
-        
-        return success_count > 0
+        await self.event_bus.emit_to_room(_user_room(user_id), event, data)
+        return True
     
     async def broadcast_to_module(self, module: AppModule, event: str, data: Dict):
         """Send event to all users currently in a specific module"""
-        success_count = 0
-        for session in self.sessions.values():
-            if session.current_module == module:
-                try:
-                    await self.event_bus.emit_to_socket(session.socket_id, event, data)
-                    success_count += 1
-                except Exception as e:
-                    logger.error(f"❌ Failed to send to {session.socket_id}: {e}")
+        recipients = len(self.module_sessions[module])
+        if not recipients:
+            return 0
         
-        return success_count
+        await self.event_bus.emit_to_room(_module_room(module), event, data)
+        return recipients
     
     def get_session(self, socket_id: str) -> Optional[UserSession]:
         """Get session by socket ID"""
@@ -307,17 +343,26 @@ class ClientManager:
     
     def get_module_users(self, module: AppModule) -> Set[str]:
         """Get all user IDs currently in a module"""
-        return {
-            session.user_id for session in self.sessions.values()
-            if session.current_module == module and session.user_id
-        }
+        user_ids = set()
+        for socket_id in self.module_sessions[module]:
+            session = self.sessions.get(socket_id)
+            if session and session.user_id:
+                user_ids.add(session.user_id)
+        return user_ids
     
     async def shutdown(self):
         """Shutdown client manager and cleanup all sessions"""
         logger.info("🛑 Shutting down Client Manager...")
         
-        # Cleanup all active sessions
-        for socket_id in list(self.sessions.keys()):
-            await self.handle_disconnect(socket_id)
+        self._shutting_down = True
+        
+        # Cleanup all active sessions, disconnecting each batch concurrently
+        socket_ids = list(self.sessions.keys())
+        for start in range(0, len(socket_ids), _SHUTDOWN_BATCH_SIZE):
+            batch = socket_ids[start:start + _SHUTDOWN_BATCH_SIZE]
+            await asyncio.gather(
+                *(self.handle_disconnect(socket_id) for socket_id in batch),
+                return_exceptions=True
+            )
         
         logger.info("✅ Client Manager shut down")
\ No newline at end of file
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+DB Pool - Bounded SQLite connection pool
+One writer connection plus up to N reader connections, opened on first use and reused
+"""
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+logger = logging.getLogger('DBPool')
+
+
+class ConnectionPool:
+    """
+    Dual SQLite connection pool: a single writer (SQLite allows one writer at a time)
+    and a bounded set of readers. Connections come from the given factory and must be
+    created with check_same_thread=False since they move between request threads.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], readers: Optional[int] = None):
+        self._connect = connect
+        self._max_readers = readers or os.cpu_count() or 4
+        self._readers = queue.LifoQueue(maxsize=self._max_readers)
+        self._writer = queue.LifoQueue(maxsize=1)
+        self._lock = threading.Lock()
+        self._opened: List[sqlite3.Connection] = []
+        self._reader_count = 0
+        self._writer_opened = False
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = self._connect()
+        self._opened.append(conn)
+        return conn
+
+    def _checkout_reader(self) -> sqlite3.Connection:
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            if self._reader_count < self._max_readers:
+                self._reader_count += 1
+                return self._open()
+        # All readers are busy; wait for one to be returned
+        return self._readers.get()
+
+    def _checkout_writer(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            if not self._writer_opened:
+                self._writer_opened = True
+                return self._open()
+        return self._writer.get()
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """Check out a reader connection for SELECTs"""
+        conn = self._checkout_reader()
+        try:
+            yield conn
+        finally:
+            # Never hand back a connection with an open transaction
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """Check out the writer connection; commits on success, rolls back on error"""
+        conn = self._checkout_writer()
+        try:
+            # Take the write lock up front so a reader can't upgrade-deadlock us mid-transaction
+            conn.execute('BEGIN IMMEDIATE')
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._writer.put(conn)
+
+    def close(self):
+        """Close every connection the pool has opened"""
+        with self._lock:
+            self._closed = True
+            opened, self._opened = self._opened, []
+        for conn in opened:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.warning(f"Error closing pooled connection: {e}")
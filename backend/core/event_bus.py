@@ -5,22 +5,209 @@ Handles events between components and WebSocket communication
 """
 
 import asyncio
+import itertools
 import logging
-from typing import Dict, List, Callable, Any, Optional
+import secrets
+import threading
+from array import array
+from collections import deque
+from typing import Dict, List, Set, Callable, Any, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import json
 
 logger = logging.getLogger('EventBus')
 
+# Subscription IDs only need to be unique within this process
+_SUBSCRIPTION_ID_PREFIX = f"sub-{secrets.token_hex(4)}"
+_subscription_counter = itertools.count(1)
 
-@dataclass
+# Metadata keys emit() adds to every payload before dispatch
+_ENRICHMENT_KEYS = ('event_type', 'timestamp', 'source')
+
+
+@dataclass(slots=True)
 class EventSubscription:
     """Event subscription data"""
     event_type: str
     callback: Callable
     component_name: str
     subscription_id: str
+    is_coroutine: bool = False
+
+
+class _DispatchPlan:
+    """Subscribers of one event type, pre-split into sync and async callbacks"""
+    __slots__ = ('subscribers', 'sync_subscribers', 'async_subscribers')
+    
+    def __init__(self, subscribers: List[EventSubscription]):
+        self.subscribers = subscribers
+        self.sync_subscribers = [sub for sub in subscribers if not sub.is_coroutine]
+        self.async_subscribers = [sub for sub in subscribers if sub.is_coroutine]
+
+
+class EventHistoryRing:
+    """
+    Fixed-capacity ring buffer of event history records
+    
+    Records are stored column-wise in flat arrays; event types and payload key
+    sets are interned to small ints. Emitters only append to a bounded pending
+    deque (atomic, loop- and thread-agnostic); pending records are written into
+    the columns under a lock when the history is read. Dicts are only
+    materialized on read.
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._pending: deque = deque(maxlen=capacity)
+        self._reset()
+    
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._reset()
+    
+    def _reset(self):
+        self._event_type_ids = array('i', [0]) * self.capacity
+        self._key_set_ids = array('i', [0]) * self.capacity
+        self._subscriber_counts = array('i', [0]) * self.capacity
+        self._timestamps: List[Optional[str]] = [None] * self.capacity
+        self._event_types: List[str] = []
+        self._event_type_ids_by_name: Dict[str, int] = {}
+        self._key_sets: List[Tuple[str, ...]] = []
+        self._key_set_ids_by_keys: Dict[Tuple[str, ...], int] = {}
+        self._head = 0  # Next slot to write
+        self._size = 0
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self._flush()
+            return self._size
+    
+    @staticmethod
+    def _intern(value, values: List, ids_by_value: Dict) -> int:
+        value_id = ids_by_value.get(value)
+        if value_id is None:
+            value_id = len(values)
+            values.append(value)
+            ids_by_value[value] = value_id
+        return value_id
+    
+    def append(self, event_type: str, data_keys: Tuple[str, ...], timestamp: str, subscriber_count: int):
+        """Queue a record; it is written into the ring on the next read"""
+        self._pending.append((event_type, data_keys, timestamp, subscriber_count))
+    
+    def _flush(self):
+        """Write pending records into the ring (caller holds the lock)"""
+        while self._pending:
+            self._write(*self._pending.popleft())
+    
+    def _write(self, event_type: str, data_keys: Tuple[str, ...], timestamp: str, subscriber_count: int):
+        slot = self._head
+        self._event_type_ids[slot] = self._intern(event_type, self._event_types, self._event_type_ids_by_name)
+        self._key_set_ids[slot] = self._intern(data_keys, self._key_sets, self._key_set_ids_by_keys)
+        self._subscriber_counts[slot] = subscriber_count
+        self._timestamps[slot] = timestamp
+        self._head = (slot + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+    
+    def records(self, limit: int) -> List[Dict]:
+        """Materialize records oldest-first; limit slices like list[-limit:]"""
+        with self._lock:
+            self._flush()
+            return self._materialize(limit)
+    
+    def _materialize(self, limit: int) -> List[Dict]:
+        start = (self._head - self._size) % self.capacity
+        slots = [(start + offset) % self.capacity for offset in range(self._size)][-limit:]
+        return [
+            {
+                'event_type': self._event_types[self._event_type_ids[slot]],
+                'timestamp': self._timestamps[slot],
+                'data_keys': list(self._key_sets[self._key_set_ids[slot]]),
+                'subscriber_count': self._subscriber_counts[slot]
+            }
+            for slot in slots
+        ]
+
+
+class _TopicTrieNode:
+    """Node of the wildcard subscription trie (one level per event_type token)"""
+    __slots__ = ('children', 'patterns')
+    
+    def __init__(self):
+        self.children: Dict[str, '_TopicTrieNode'] = {}
+        self.patterns: List[str] = []  # Wildcard patterns ending at this node
+
+
+class TopicTrie:
+    """
+    Routes event types to wildcard subscription patterns
+    
+    Event types are split into tokens on '_' (e.g. 'file_organizer_user_joining').
+    In a pattern, '*' matches exactly one token and a trailing '#' matches any
+    remaining tokens, so 'file_organizer_#' matches every file organizer event.
+    """
+    
+    SEPARATOR = '_'
+    SINGLE = '*'
+    MULTI = '#'
+    
+    def __init__(self):
+        self.root = _TopicTrieNode()
+    
+    @classmethod
+    def is_pattern(cls, event_type: str) -> bool:
+        """Whether an event_type contains wildcard tokens"""
+        tokens = event_type.split(cls.SEPARATOR)
+        return cls.SINGLE in tokens or cls.MULTI in tokens
+    
+    def insert(self, pattern: str):
+        node = self.root
+        for token in pattern.split(self.SEPARATOR):
+            node = node.children.setdefault(token, _TopicTrieNode())
+        if pattern not in node.patterns:
+            node.patterns.append(pattern)
+    
+    def remove(self, pattern: str):
+        path = [self.root]
+        tokens = pattern.split(self.SEPARATOR)
+        for token in tokens:
+            child = path[-1].children.get(token)
+            if child is None:
+                return
+            path.append(child)
+        if pattern in path[-1].patterns:
+            path[-1].patterns.remove(pattern)
+        # Prune nodes that no longer lead to any pattern
+        for depth in range(len(tokens), 0, -1):
+            node = path[depth]
+            if node.patterns or node.children:
+                break
+            del path[depth - 1].children[tokens[depth - 1]]
+    
+    def match(self, event_type: str) -> List[str]:
+        """Return all wildcard patterns matching event_type"""
+        tokens = event_type.split(self.SEPARATOR)
+        matches: List[str] = []
+        stack = [(self.root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            multi = node.children.get(self.MULTI)
+            if multi is not None:
+                matches.extend(multi.patterns)
+            if depth == len(tokens):
+                matches.extend(node.patterns)
+                continue
+            exact = node.children.get(tokens[depth])
+            if exact is not None:
+                stack.append((exact, depth + 1))
+            single = node.children.get(self.SINGLE)
+            if single is not None:
+                stack.append((single, depth + 1))
+        return matches
 
 
 class EventBus:
@@ -36,9 +223,14 @@ class EventBus:
     
     def __init__(self):
         self.subscriptions: Dict[str, List[EventSubscription]] = {}
+        self.wildcard_trie = TopicTrie()  # Wildcard patterns present in subscriptions
+        self._subscription_index: Dict[str, str] = {}  # subscription_id -> event_type
+        self._component_subscriptions: Dict[str, Set[str]] = {}  # component_name -> subscription_ids
+        self._dispatch_plans: Dict[str, _DispatchPlan] = {}  # event_type -> plan, reset on (un)subscribe
         self.socketio_instance = None
-        self.event_history: List[Dict] = []
         self.max_history = 1000
+        self.history_enabled = True  # Debug aid; disable to skip per-emit history records
+        self.event_history = EventHistoryRing(self.max_history)
         
         logger.info("🎯 Event Bus initialized")
     
@@ -48,62 +240,113 @@ class EventBus:
         logger.info("🔌 SocketIO instance connected to Event Bus")
     
     def subscribe(self, event_type: str, callback: Callable, component_name: str = "unknown") -> str:
-        """Subscribe to an event type"""
-        import uuid
-        subscription_id = str(uuid.uuid4())
+        """Subscribe to an event type or wildcard pattern (see TopicTrie)"""
+        subscription_id = f"{_SUBSCRIPTION_ID_PREFIX}-{next(_subscription_counter):x}"
         
         subscription = EventSubscription(
             event_type=event_type,
             callback=callback,
             component_name=component_name,
-            subscription_id=subscription_id
+            subscription_id=subscription_id,
+            is_coroutine=asyncio.iscoroutinefunction(callback)
         )
         
         if event_type not in self.subscriptions:
             self.subscriptions[event_type] = []
+            if TopicTrie.is_pattern(event_type):
+                self.wildcard_trie.insert(event_type)
         
         self.subscriptions[event_type].append(subscription)
+        self._dispatch_plans.clear()
+        self._subscription_index[subscription_id] = event_type
+        self._component_subscriptions.setdefault(component_name, set()).add(subscription_id)
         
-        logger.debug(f"📝 {component_name} subscribed to '{event_type}' (ID: {subscription_id[:8]})")
+        logger.debug(f"📝 {component_name} subscribed to '{event_type}' (ID: {subscription_id})")
         return subscription_id
     
     def unsubscribe(self, subscription_id: str):
         """Unsubscribe from an event"""
-        for event_type, subs in self.subscriptions.items():
-            self.subscriptions[event_type] = [
-                sub for sub in subs if sub.subscription_id != subscription_id
-            ]
+        event_type = self._subscription_index.pop(subscription_id, None)
+        if event_type is not None:
+            # Rebuild only this event's list (copy-on-write keeps in-flight emits safe)
+            subs = []
+            for sub in self.subscriptions.get(event_type, []):
+                if sub.subscription_id == subscription_id:
+                    self._discard_component_subscription(sub.component_name, subscription_id)
+                else:
+                    subs.append(sub)
+            self.subscriptions[event_type] = subs
+            self._dispatch_plans.clear()
+            if not subs and TopicTrie.is_pattern(event_type):
+                self.wildcard_trie.remove(event_type)
+                self.subscriptions.pop(event_type, None)
         
-        logger.debug(f"🗑️ Unsubscribed: {subscription_id[:8]}")
+        logger.debug(f"🗑️ Unsubscribed: {subscription_id}")
     
     def unsubscribe_component(self, component_name: str):
         """Unsubscribe all events for a component"""
-        removed_count = 0
-        for event_type, subs in self.subscriptions.items():
-            original_count = len(subs)
-            self.subscriptions[event_type] = [
-                sub for sub in subs if sub.component_name != component_name
-            ]
-            removed_count += original_count - len(self.subscriptions[event_type])
+        subscription_ids = list(self._component_subscriptions.get(component_name, ()))
+        for subscription_id in subscription_ids:
+            self.unsubscribe(subscription_id)
+        
+        logger.info(f"🗑️ Unsubscribed {len(subscription_ids)} events for component: {component_name}")
+    
+    def _discard_component_subscription(self, component_name: str, subscription_id: str):
+        """Remove a subscription from the per-component index"""
+        component_subs = self._component_subscriptions.get(component_name)
+        if component_subs is None:
+            return
+        component_subs.discard(subscription_id)
+        if not component_subs:
+            del self._component_subscriptions[component_name]
+    
+    def _get_dispatch_plan(self, event_type: str) -> _DispatchPlan:
+        """Cached subscriber resolution for event_type (exact + wildcard)"""
+        plan = self._dispatch_plans.get(event_type)
+        if plan is None:
+            plan = _DispatchPlan(self._get_subscribers(event_type))
+            self._dispatch_plans[event_type] = plan
+        return plan
+    
+    def _get_subscribers(self, event_type: str) -> List[EventSubscription]:
+        """Exact subscribers of event_type followed by matching wildcard subscribers"""
+        subscribers = self.subscriptions.get(event_type, [])
+        if not self.wildcard_trie.root.children:
+            return subscribers
+        
+        patterns = self.wildcard_trie.match(event_type)
+        if not patterns:
+            return subscribers
         
-        logger.info(f"🗑️ Unsubscribed {removed_count} events for component: {component_name}")
+        subscribers = list(subscribers)
+        for pattern in patterns:
+            subscribers.extend(self.subscriptions.get(pattern, []))
+        return subscribers
     
     async def emit(self, event_type: str, data: Dict[str, Any]):
         """Emit event to internal subscribers and WebSocket clients"""
         try:
+            plan = self._get_dispatch_plan(event_type)
+            timestamp = datetime.now().isoformat()
+            
+            # Store in history
+            if self.history_enabled:
+                self._add_to_history(event_type, data, timestamp, len(plan.subscribers))
+            
+            # Nobody observes this event - skip enrichment and dispatch
+            if not plan.subscribers and self.socketio_instance is None:
+                return
+            
             # Add timestamp and event metadata
             enriched_data = {
                 **data,
                 'event_type': event_type,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': timestamp,
                 'source': 'backend'
             }
             
-            # Store in history
-            self._add_to_history(event_type, enriched_data)
-            
             # Emit to internal subscribers
-            await self._emit_internal(event_type, enriched_data)
+            await self._emit_internal(event_type, enriched_data, plan)
             
             # Emit to WebSocket clients
             await self._emit_websocket(event_type, enriched_data)
@@ -111,26 +354,74 @@ class EventBus:
         except Exception as e:
             logger.error(f"❌ Error emitting event '{event_type}': {e}")
     
-    async def _emit_internal(self, event_type: str, data: Dict[str, Any]):
-        """Emit to internal component subscribers"""
-        if event_type not in self.subscriptions:
+    async def emit_many(self, events: List[Tuple[str, Dict[str, Any]]]):
+        """Emit several events in order, sharing timestamp and enrichment overhead"""
+        if not events:
             return
-        
-        subscribers = self.subscriptions[event_type]
-        if not subscribers:
+        try:
+            timestamp = datetime.now().isoformat()
+            has_websocket = self.socketio_instance is not None
+            enriched_events = []
+            for event_type, data in events:
+                plan = self._get_dispatch_plan(event_type)
+                
+                # Store in history
+                if self.history_enabled:
+                    self._add_to_history(event_type, data, timestamp, len(plan.subscribers))
+                
+                # Nobody observes this event - skip enrichment and dispatch
+                if not plan.subscribers and not has_websocket:
+                    continue
+                
+                enriched_events.append((event_type, plan, {
+                    **data,
+                    'event_type': event_type,
+                    'timestamp': timestamp,
+                    'source': 'backend'
+                }))
+            
+            if not enriched_events:
+                return
+            
+            # Dispatch in the given order so subscribers and clients see e.g. "left" before "joined"
+            for event_type, plan, enriched_data in enriched_events:
+                if plan.subscribers:
+                    await self._emit_internal(event_type, enriched_data, plan)
+                if has_websocket:
+                    await self._emit_websocket(event_type, enriched_data)
+            
+        except Exception as e:
+            event_types = [event_type for event_type, _ in events]
+            logger.error(f"❌ Error emitting events {event_types}: {e}")
+    
+    async def _emit_internal(self, event_type: str, data: Dict[str, Any],
+                             plan: Optional[_DispatchPlan] = None):
+        """Emit to internal component subscribers"""
+        if plan is None:
+            plan = self._get_dispatch_plan(event_type)
+        if not plan.subscribers:
             return
         
-        logger.debug(f"📡 Emitting '{event_type}' to {len(subscribers)} internal subscribers")
+        logger.debug(f"📡 Emitting '{event_type}' to {len(plan.subscribers)} internal subscribers")
         
-        # Call all subscribers
-        for subscription in subscribers:
+        # Call sync subscribers inline
+        for subscription in plan.sync_subscribers:
             try:
-                if asyncio.iscoroutinefunction(subscription.callback):
-                    await subscription.callback(data)
-                else:
-                    subscription.callback(data)
+                subscription.callback(data)
             except Exception as e:
                 logger.error(f"❌ Error in subscriber {subscription.component_name}: {e}")
+        
+        # Run async subscribers concurrently
+        if not plan.async_subscribers:
+            return
+        
+        results = await asyncio.gather(
+            *(subscription.callback(data) for subscription in plan.async_subscribers),
+            return_exceptions=True
+        )
+        for subscription, result in zip(plan.async_subscribers, results):
+            if isinstance(result, Exception):
+                logger.error(f"❌ Error in subscriber {subscription.component_name}: {result}")
     
     async def _emit_websocket(self, event_type: str, data: Dict[str, Any]):
         """Emit to WebSocket clients (thread-safe for any async_mode)."""
@@ -177,42 +468,52 @@ class EventBus:
         except Exception as e:
             logger.error(f"❌ Error emitting to room {room}: {e}")
     
-    def _add_to_history(self, event_type: str, data: Dict[str, Any]):
-        """Add event to history for debugging"""
-        event_record = {
-            'event_type': event_type,
-            'timestamp': datetime.now().isoformat(),
-            'data_keys': list(data.keys()),
-            'subscriber_count': len(self.subscriptions.get(event_type, []))
-        }
-        
-        self.event_history.append(event_record)
-        
-        # Keep history within limits
-        if len(self.event_history) > self.max_history:
-            self.event_history = self.event_history[-self.max_history:]
+    def enter_room(self, socket_id: str, room: str):
+        """Add a WebSocket client to a room so room emits reach it"""
+        if not self.socketio_instance:
+            return
+        try:
+            self.socketio_instance.server.enter_room(socket_id, room, namespace='/')
+            logger.debug(f"🏠 Socket {socket_id[:8]} entered room '{room}'")
+        except Exception as e:
+            logger.error(f"❌ Error adding socket {socket_id} to room {room}: {e}")
+    
+    def leave_room(self, socket_id: str, room: str):
+        """Remove a WebSocket client from a room"""
+        if not self.socketio_instance:
+            return
+        try:
+            self.socketio_instance.server.leave_room(socket_id, room, namespace='/')
+            logger.debug(f"🏠 Socket {socket_id[:8]} left room '{room}'")
+        except Exception as e:
+            logger.error(f"❌ Error removing socket {socket_id} from room {room}: {e}")
+    
+    def _add_to_history(self, event_type: str, data: Dict[str, Any], timestamp: str, subscriber_count: int):
+        """Add event to history for debugging (data_keys lists the enriched payload's keys)"""
+        # Same keys as {**data, 'event_type', 'timestamp', 'source'} without building that dict
+        data_keys = tuple(data) + tuple(key for key in _ENRICHMENT_KEYS if key not in data)
+        # Deferred write; the ring overwrites the oldest record once max_history is reached
+        self.event_history.append(event_type, data_keys, timestamp, subscriber_count)
     
     def get_event_history(self, limit: int = 50) -> List[Dict]:
         """Get recent event history for debugging"""
-        return self.event_history[-limit:]
+        return self.event_history.records(limit)
     
-    def get_subscription_stats(self) -> Dict[str, Any]:
-        """Get subscription statistics"""
+    def get_subscription_stats(self, detailed: bool = False) -> Dict[str, Any]:
+        """Get subscription statistics (per-event component lists only when detailed)"""
         stats = {
             'total_event_types': len(self.subscriptions),
-            'total_subscriptions': sum(len(subs) for subs in self.subscriptions.values()),
+            'total_subscriptions': len(self._subscription_index),
             'events_by_type': {},
-            'components': set()
+            'components': list(self._component_subscriptions)
         }
         
         for event_type, subs in self.subscriptions.items():
-            stats['events_by_type'][event_type] = {
-                'subscriber_count': len(subs),
-                'components': [sub.component_name for sub in subs]
-            }
-            stats['components'].update(sub.component_name for sub in subs)
+            event_stats = {'subscriber_count': len(subs)}
+            if detailed:
+                event_stats['components'] = [sub.component_name for sub in subs]
+            stats['events_by_type'][event_type] = event_stats
         
-        stats['components'] = list(stats['components'])
         return stats
     
     async def health_check(self) -> Dict[str, Any]:
@@ -223,6 +524,7 @@ class EventBus:
             'status': 'healthy',
             'socketio_connected': self.socketio_instance is not None,
             'subscription_stats': stats,
+            'history_enabled': self.history_enabled,
             'recent_events': len(self.event_history),
             'max_history': self.max_history
         }
@@ -233,6 +535,10 @@ class EventBus:
         
         # Clear all subscriptions
         self.subscriptions.clear()
+        self.wildcard_trie = TopicTrie()
+        self._subscription_index.clear()
+        self._component_subscriptions.clear()
+        self._dispatch_plans.clear()
         
         # Clear history
         self.event_history.clear()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+JSON Codec - Fast JSON serialization for HTTP and WebSocket payloads
+Uses orjson when it is installed and falls back to the standard json module
+"""
+
+import json
+from datetime import date
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _default(obj: Any) -> Any:
+    """stdlib fallback for types orjson encodes natively (datetime/date as ISO-8601)"""
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> str:
+    """Serialize obj to a compact JSON string; datetimes are emitted as ISO-8601"""
+    if orjson:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), default=_default)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """dumps as UTF-8 bytes for HTTP bodies; orjson output is used as-is, with no str round-trip"""
+    if orjson:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+    return json.dumps(obj, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def loads(data: Any) -> Any:
+    """Deserialize a JSON str/bytes document"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def request_json() -> dict:
+    """Current Flask request's JSON body as a dict ({} if missing or malformed), not cached on the request"""
+    from flask import request
+    try:
+        data = loads(request.get_data(cache=False))
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def json_response(obj: Any, status: int = 200):
+    """Flask JSON response encoded by this codec (orjson when installed) instead of jsonify"""
+    from flask import current_app
+    return current_app.response_class(dumps_bytes(obj), status=status, mimetype='application/json')
+
+
+class SocketIOJSON:
+    """
+    Drop-in `json` module for python-socketio packet encoding (packets are str, so this
+    uses dumps; HTTP bodies use dumps_bytes)
+
+    python-socketio calls dumps(data, separators=...) and loads(data); the extra
+    keyword arguments are accepted and ignored since output is always compact.
+    """
+
+    @staticmethod
+    def dumps(obj: Any, *args, **kwargs) -> str:
+        return dumps(obj)
+
+    @staticmethod
+    def loads(data: Any, *args, **kwargs) -> Any:
+        return loads(data)
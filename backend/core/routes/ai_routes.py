@@ -5,11 +5,46 @@ Handles: suggest-destination, explain-operation, suggest-alternatives
 """
 
 import logging
+import os
+from functools import lru_cache
 from flask import request, jsonify
 from pathlib import Path
 
 logger = logging.getLogger('AIRoutes')
 
+_REJECTED_OPERATION_FIELDS = ('source', 'destination', 'type')
+
+_DELETE_EXPLANATION_PROMPT = """Explain in 1-2 sentences why this file should be deleted:
+
+File: {file_name}
+Reason: This is a redundant archive file - the content has already been extracted.
+
+Return ONLY valid JSON with this structure:
+{{"reason": "your friendly explanation here"}}"""
+
+_MOVE_EXPLANATION_PROMPT = """Explain in 2-3 sentences why this file organization makes sense:
+
+File: {file_name}
+Action: {operation_type}
+Destination: {destination}
+
+Provide a friendly, human-readable explanation that helps the user understand the reasoning.
+Return ONLY valid JSON with this structure:
+{{"reason": "your explanation here"}}"""
+
+
+class _ExplanationFailed(Exception):
+    """AI explanation call failed; carries the error result for the response"""
+
+    def __init__(self, result):
+        super().__init__(result.get('error'))
+        self.result = result
+
+
+def _file_name(path: str) -> str:
+    """Final component of a POSIX or Windows path (cheap Path(path).name)"""
+    return path.rstrip('/\\').rsplit('/', 1)[-1].rsplit('\\', 1)[-1]
+
 
 def register_ai_routes(app, web_server):
     """Register AI-powered routes with the Flask app"""
@@ -24,11 +59,9 @@ def register_ai_routes(app, web_server):
             if not file_path:
                 return jsonify({'success': False, 'error': 'file_path required'}), 400
             
-            from file_organizer.ai_content_analyzer import AIContentAnalyzer
-            shared_services = web_server.components.get('shared_services')
-            analyzer = AIContentAnalyzer(shared_services=shared_services)
-            
-            result = analyzer.analyze_file(file_path, use_ai=True)
+            # The AI call runs off the gevent hub so other requests keep being served
+            analyzer = web_server._get_ai_content_analyzer()
+            result = web_server._run_blocking(analyzer.analyze_file, file_path, use_ai=True)
             
             if not result.get('success'):
                 return jsonify(result), 503
@@ -43,6 +76,27 @@ def register_ai_routes(app, web_server):
             logger.error(f"/suggest-destination error: {e}", exc_info=True)
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    @lru_cache(maxsize=4096)
+    def _explain(file_name, destination, operation_type):
+        """AI explanation for an operation (failures raise, so they are not cached)"""
+        if operation_type == 'delete':
+            prompt = _DELETE_EXPLANATION_PROMPT.format(file_name=file_name)
+        else:
+            prompt = _MOVE_EXPLANATION_PROMPT.format(file_name=file_name, operation_type=operation_type, destination=destination)
+        
+        # Call AI to generate explanation
+        result = web_server._call_ai_with_recovery(prompt)
+        
+        if not result.get('success'):
+            raise _ExplanationFailed(result)
+        
+        # Extract reason from JSON response
+        reason = result.get('data', {}).get('reason', '').strip()
+        
+        if not reason:
+            reason = "This file has been categorized based on its content and metadata."
+        return reason
+    
     @app.route('/api/file-organizer/explain-operation', methods=['POST'])
     def fo_explain_operation():
         """
@@ -58,40 +112,15 @@ def register_ai_routes(app, web_server):
             if not source:
                 return jsonify({'success': False, 'error': 'source required'}), 400
             
-            # Build explanation prompt based on operation type
-            if operation_type == 'delete':
-                prompt = f"""Explain in 1-2 sentences why this file should be deleted:
-
-File: {Path(source).name}
-Reason: This is a redundant archive file - the content has already been extracted.
-
-Return ONLY valid JSON with this structure:
-{{"reason": "your friendly explanation here"}}"""
-            else:
-                if not destination:
-                    return jsonify({'success': False, 'error': 'destination required for move/copy operations'}), 400
-                
-                prompt = f"""Explain in 2-3 sentences why this file organization makes sense:
-
-File: {Path(source).name}
-Action: {operation_type}
-Destination: {destination}
-
-Provide a friendly, human-readable explanation that helps the user understand the reasoning.
-Return ONLY valid JSON with this structure:
-{{"reason": "your explanation here"}}"""
-            
-            # Call AI to generate explanation
-            result = web_server._call_ai_with_recovery(prompt)
-            
-            if not result.get('success'):
-                return jsonify(result), 503
+            if operation_type != 'delete' and not destination:
+                return jsonify({'success': False, 'error': 'destination required for move/copy operations'}), 400
             
-            # Extract reason from JSON response
-            reason = result.get('data', {}).get('reason', '').strip()
-            
-            if not reason:
-                reason = "This file has been categorized based on its content and metadata."
+            # Explanations depend only on file name, action and destination, so identical
+            # requests are answered from cache; delete prompts don't use the destination
+            try:
+                reason = _explain(_file_name(source), None if operation_type == 'delete' else destination, operation_type)
+            except _ExplanationFailed as failure:
+                return jsonify(failure.result), 503
             
             return jsonify({
                 'success': True,
@@ -105,11 +134,7 @@ Return ONLY valid JSON with this structure:
     def _get_destination_manager():
         """Get DestinationMemoryManager instance"""
         try:
-            file_organizer_app = web_server.app_manager.get_module_app('file_organizer')
-            if file_organizer_app and hasattr(file_organizer_app, 'path_memory_manager'):
-                path_mgr = file_organizer_app.path_memory_manager
-                if hasattr(path_mgr, '_destination_manager'):
-                    return path_mgr._destination_manager
+            return web_server._get_file_organizer_manager('_destination_manager')
         except Exception as e:
             logger.warning(f"Could not get DestinationMemoryManager: {e}")
         return None
@@ -130,11 +155,14 @@ Return ONLY valid JSON with this structure:
             if not rejected_operation:
                 return jsonify({'success': False, 'error': 'rejected_operation required'}), 400
             
-            # Validate rejected_operation structure
-            required_fields = ['source', 'destination', 'type']
-            for field in required_fields:
-                if field not in rejected_operation:
-                    return jsonify({'success': False, 'error': f'rejected_operation.{field} required'}), 400
+            # Validate rejected_operation structure (report every missing field at once)
+            if isinstance(rejected_operation, dict):
+                missing = [field for field in _REJECTED_OPERATION_FIELDS if field not in rejected_operation]
+            else:
+                missing = _REJECTED_OPERATION_FIELDS
+            if missing:
+                missing_fields = ', '.join(f'rejected_operation.{field}' for field in missing)
+                return jsonify({'success': False, 'error': f'{missing_fields} required'}), 400
             
             # Try to get alternatives from known destinations first
             alternatives = []
@@ -142,9 +170,6 @@ Return ONLY valid JSON with this structure:
             
             if dest_manager:
                 try:
-                    from pathlib import Path
-                    import uuid
-                    
                     # Extract category from rejected destination
                     rejected_dest = rejected_operation['destination']
                     rejected_dest_folder = str(Path(rejected_dest).parent)
@@ -161,27 +186,28 @@ Return ONLY valid JSON with this structure:
                         if d.path != rejected_dest_folder
                     ]
                     
-                    # Create alternative operations
+                    # Create alternative operations (limit to 5)
                     source_file = rejected_operation['source']
-                    source_filename = Path(source_file).name
+                    source_filename = _file_name(source_file)
+                    operation_type = rejected_operation['type']
+                    candidates = alternative_destinations[:5]
+                    # One urandom read for all operation ids
+                    operation_ids = os.urandom(4 * len(candidates)).hex()
                     
-                    for dest in alternative_destinations[:5]:  # Limit to 5 alternatives
-                        alt_dest_path = str(Path(dest.path) / source_filename)
-                        
-                        # Build reason
-                        reason_parts = [f"Alternative: {dest.category} folder"]
-                        if dest.usage_count > 0:
-                            reason_parts.append(f"used {dest.usage_count} time{'s' if dest.usage_count != 1 else ''} previously")
-                        reason = " - ".join(reason_parts)
-                        
-                        alternatives.append({
-                            'operation_id': f"alt_{str(uuid.uuid4())[:8]}",
-                            'type': rejected_operation['type'],
+                    alternatives = [
+                        {
+                            'operation_id': f"alt_{operation_ids[index * 8:index * 8 + 8]}",
+                            'type': operation_type,
                             'source': source_file,
-                            'destination': alt_dest_path,
-                            'reason': reason,
+                            'destination': os.path.join(dest.path, source_filename),
+                            'reason': f"Alternative: {dest.category} folder" + (
+                                f" - used {dest.usage_count} time{'s' if dest.usage_count != 1 else ''} previously"
+                                if dest.usage_count > 0 else ''
+                            ),
                             'status': 'pending'
-                        })
+                        }
+                        for index, dest in enumerate(candidates)
+                    ]
                     
                     if alternatives:
                         logger.info(f"Found {len(alternatives)} alternative destination(s) from known destinations")
@@ -197,9 +223,7 @@ Return ONLY valid JSON with this structure:
             # Fallback to AI-generated alternatives
             logger.info("No known alternatives found, falling back to AI generation")
             
-            from file_organizer.ai_content_analyzer import AIContentAnalyzer
-            shared_services = web_server.components.get('shared_services')
-            analyzer = AIContentAnalyzer(shared_services=shared_services)
+            analyzer = web_server._get_ai_content_analyzer()
             
             result = analyzer.suggest_alternatives(rejected_operation)
             
@@ -5,12 +5,32 @@ Handles: analyze-content, analyze-content-batch, analyze-archive, scan-duplicate
 """
 
 import logging
-from flask import request, jsonify
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from flask import Response, request, jsonify
 from pathlib import Path
 
+from core.json_codec import dumps_bytes, json_response
+from core.web_server import AI_BATCH_CHUNK_SIZE, MAX_BATCH_WORKERS
+
 logger = logging.getLogger('AnalysisRoutes')
 
 
+def _path_key(path: str) -> str:
+    """
+    Key under which paths naming the same file compare equal on this platform.
+    realpath resolves symlinks before '..' is applied, so a/link/../x is only
+    equal to a/x when link really lives in a.
+    """
+    return os.path.normcase(os.path.realpath(path))
+
+
+def _path_keys(file_paths) -> dict:
+    """_path_key for every path (stats each component - run through web_server._run_blocking)"""
+    return {file_path: _path_key(file_path) for file_path in file_paths}
+
+
 def register_analysis_routes(app, web_server):
     """Register analysis routes with the Flask app"""
     
@@ -25,11 +45,9 @@ def register_analysis_routes(app, web_server):
             if not file_path:
                 return jsonify({'success': False, 'error': 'file_path required'}), 400
             
-            from file_organizer.ai_content_analyzer import AIContentAnalyzer
-            shared_services = web_server.components.get('shared_services')
-            analyzer = AIContentAnalyzer(shared_services=shared_services)
+            analyzer = web_server._get_ai_content_analyzer()
             
-            result = analyzer.analyze_file(file_path, use_ai=use_ai)
+            result = web_server._run_blocking(analyzer.analyze_file, file_path, use_ai=use_ai)
             
             if not result.get('success'):
                 return jsonify(result), 503
@@ -40,9 +58,63 @@ def register_analysis_routes(app, web_server):
             logger.error(f"/analyze-content error: {e}", exc_info=True)
             return jsonify({'success': False, 'error': str(e)}), 500
 
+    def _stream_batch_analysis(file_paths, path_keys, canonical_paths, unique_paths, use_ai, workers):
+        """
+        Yield Server-Sent Events with one {'file_path', 'result'} record per requested
+        path as soon as the batch containing it finishes, then a final {'done': True}.
+        Files are split like _batch_analyze_files does (AI chunks or single files).
+        Finished chunks are handed over through a queue so waiting for the next one
+        goes through web_server._run_blocking instead of blocking the gevent hub.
+        """
+        workers = max(1, min(workers, MAX_BATCH_WORKERS))
+        if use_ai:
+            chunk_size = AI_BATCH_CHUNK_SIZE if workers > 1 else len(unique_paths)
+        else:
+            chunk_size = 1
+        chunks = [unique_paths[i:i + chunk_size] for i in range(0, len(unique_paths), chunk_size)]
+        
+        aliases = {}
+        for file_path in file_paths:
+            aliases.setdefault(canonical_paths[path_keys[file_path]], []).append(file_path)
+        
+        failed_chunks = 0
+        finished = queue.Queue()
+        executor = ThreadPoolExecutor(max_workers=min(workers, len(chunks)))
+        try:
+            for chunk in chunks:
+                future = executor.submit(web_server._batch_analyze_files, chunk, use_ai=use_ai)
+                future.add_done_callback(lambda future, chunk=chunk: finished.put((chunk, future)))
+            for _ in range(len(chunks)):
+                chunk, future = web_server._run_blocking(finished.get)
+                try:
+                    chunk_result = future.result()
+                except Exception as e:
+                    logger.error(f"/analyze-content-batch stream error: {e}", exc_info=True)
+                    chunk_result = {'success': False, 'error': str(e)}
+                
+                results = chunk_result.get('results', {})
+                if not chunk_result.get('success'):
+                    failed_chunks += 1
+                for unique_path in chunk:
+                    result = results.get(unique_path) or {
+                        'success': False,
+                        'error': chunk_result.get('error') or 'No result from batch analysis',
+                        'content_type': 'unknown'
+                    }
+                    for file_path in aliases.get(unique_path, (unique_path,)):
+                        yield b'data: ' + dumps_bytes({'file_path': file_path, 'result': result}) + b'\n\n'
+        finally:
+            # Don't wait on chunks still running if the client went away mid-stream
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        yield b'data: ' + dumps_bytes({'done': True, 'success': failed_chunks < len(chunks), 'ai_enabled': bool(use_ai)}) + b'\n\n'
+
     @app.route('/api/file-organizer/analyze-content-batch', methods=['POST'])
     def fo_analyze_content_batch():
-        """Analyze multiple files' content in a single batch"""
+        """
+        Analyze multiple files' content in a single batch.
+        With ?stream=1 the results are sent as Server-Sent Events while batches complete.
+        """
         try:
             data = request.get_json(force=True, silent=True) or {}
             file_paths = data.get('file_paths', [])
@@ -51,10 +123,38 @@ def register_analysis_routes(app, web_server):
             if not file_paths:
                 return jsonify({'success': False, 'error': 'file_paths required'}), 400
             
+            try:
+                workers = int(data.get('workers', 1))
+            except (TypeError, ValueError):
+                return jsonify({'success': False, 'error': 'workers must be an integer'}), 400
+            
+            # Analyze each distinct file once; duplicates (incl. spellings like a//b vs a/b,
+            # symlinks, or case variants on Windows) reuse the result of the first equivalent path
+            path_keys = web_server._run_blocking(_path_keys, file_paths)
+            canonical_paths = {}
+            for file_path in file_paths:
+                canonical_paths.setdefault(path_keys[file_path], file_path)
+            unique_paths = list(canonical_paths.values())
+            
+            if request.args.get('stream') == '1':
+                return Response(
+                    _stream_batch_analysis(file_paths, path_keys, canonical_paths, unique_paths, use_ai, workers),
+                    mimetype='text/event-stream'
+                )
+            
             # Use shared batch analysis method (SINGLE SOURCE OF TRUTH)
-            batch_result = web_server._batch_analyze_files(file_paths, use_ai=use_ai)
+            batch_result = web_server._run_blocking(
+                web_server._batch_analyze_files, unique_paths, use_ai=use_ai, workers=workers
+            )
+            
+            results = batch_result.get('results')
+            if results is not None and len(unique_paths) < len(file_paths):
+                for file_path in file_paths:
+                    if file_path not in results:
+                        results[file_path] = results.get(canonical_paths[path_keys[file_path]])
             
-            return jsonify(batch_result)
+            # Results can be large; serialize with the fast codec (orjson when available)
+            return json_response(batch_result)
             
         except Exception as e:
             logger.error(f"/analyze-content-batch error: {e}", exc_info=True)
@@ -70,9 +170,7 @@ def register_analysis_routes(app, web_server):
             if not archive_path:
                 return jsonify({'success': False, 'error': 'archive_path required'}), 400
             
-            from file_organizer.ai_content_analyzer import AIContentAnalyzer
-            shared_services = web_server.components.get('shared_services')
-            analyzer = AIContentAnalyzer(shared_services=shared_services)
+            analyzer = web_server._get_ai_content_analyzer()
             
             result = analyzer.analyze_archive(archive_path)
             return jsonify(result)
@@ -91,9 +189,7 @@ def register_analysis_routes(app, web_server):
             if not folder_path:
                 return jsonify({'success': False, 'error': 'folder_path required'}), 400
             
-            from file_organizer.ai_content_analyzer import AIContentAnalyzer
-            shared_services = web_server.components.get('shared_services')
-            analyzer = AIContentAnalyzer(shared_services=shared_services)
+            analyzer = web_server._get_ai_content_analyzer()
             
             result = analyzer.scan_duplicates(folder_path)
             return jsonify(result)
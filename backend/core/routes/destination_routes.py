@@ -3,26 +3,184 @@
 Destination Routes - Destination management endpoints
 """
 
+import hashlib
 import logging
 import os
-from flask import request, jsonify
-import platform
+import re
 import subprocess
+import threading
+import time
+from flask import request
+import platform
 from pathlib import Path
 
+from core.json_codec import dumps_bytes, json_response, request_json
+
 logger = logging.getLogger('DestinationRoutes')
 
+_MOUNT_ESCAPE = re.compile(r'\\([0-7]{3})')
+
+# Capture requests carry one entry per file operation; larger payloads are rejected with 413
+MAX_CAPTURE_BODY_BYTES = 8 * 1024 * 1024
+MAX_CAPTURE_OPERATIONS = 10000
+# Top-level directories whose mount points are reported as drives (plus '/' itself);
+# 'Volumes' is where macOS mounts external disks
+_DRIVE_MOUNT_TOPS = frozenset(('home', 'media', 'mnt', 'Volumes'))
+
+# Fallback SQL (PathMemoryManager schema). Kept as module constants so pooled connections
+# reuse the prepared statement from sqlite3's per-connection statement cache.
+# Rows come back pre-sorted from idx_destination_mappings_user_category.
+_SELECT_DESTINATION_MAPPINGS_SQL = """
+    SELECT id, destination_path, file_category
+    FROM destination_mappings
+    WHERE user_id = ?
+    ORDER BY file_category ASC
+"""
+_DELETE_DESTINATION_MAPPING_SQL = "DELETE FROM destination_mappings WHERE id = ?"
+
+# Drive topology rarely changes; repeated get-drives calls reuse the last scan
+_DRIVES_CACHE_TTL = 5.0
+_drives_cache = {'ts': 0.0, 'val': None}  # val: (response body, etag)
+_drives_lock = threading.Lock()
+
+
+def _read_mount_points():
+    """Mount points from the Linux kernel mount table, in mount order without duplicates"""
+    mount_points = []
+    with open('/proc/self/mounts', encoding='utf-8') as mounts:
+        for line in mounts:
+            fields = line.split()
+            if len(fields) < 2:
+                continue
+            # Whitespace in mount points is octal-escaped (e.g. "\\040" for a space)
+            mount_point = fields[1]
+            if '\\' in mount_point:
+                mount_point = _MOUNT_ESCAPE.sub(lambda match: chr(int(match.group(1), 8)), mount_point)
+            if mount_point not in mount_points:
+                mount_points.append(mount_point)
+    return mount_points
+
+
+def _read_df_mount_points():
+    """Mount points reported by `df -P` (macOS and other Unixes without /proc/self/mounts)"""
+    result = subprocess.run(['df', '-P'], capture_output=True, text=True)
+    mount_points = []
+    for line in result.stdout.strip().split('\n')[1:]:
+        # POSIX format has six columns; the mount point is last and may contain spaces
+        parts = line.split(None, 5)
+        if len(parts) == 6 and parts[5] not in mount_points:
+            mount_points.append(parts[5])
+    return mount_points
+
+
+def _scan_drives():
+    """Enumerate local drives (Windows) or relevant mount points (POSIX)"""
+    drives = []
+    system = platform.system()
+
+    if system == 'Windows':
+        import ctypes
+        # One GetLogicalDrives() bitmask (bit 0 = A:) instead of stat-ing 26 roots
+        mask = ctypes.windll.kernel32.GetLogicalDrives()
+        for index in range(26):
+            if mask & (1 << index):
+                letter = chr(65 + index)
+                drives.append({'path': f"{letter}:\\", 'name': f"Drive {letter}:", 'type': 'local'})
+    else:
+        try:
+            mount_points = _read_mount_points() if system == 'Linux' else _read_df_mount_points()
+            for mount_point in mount_points:
+                # "/media/usb".split('/', 2) -> ['', 'media', 'usb']
+                parts = mount_point.split('/', 2)
+                if mount_point == '/' or (len(parts) > 1 and parts[1] in _DRIVE_MOUNT_TOPS):
+                    drives.append({'path': mount_point, 'name': mount_point, 'type': 'local'})
+        except Exception as e:
+            logger.warning(f"Could not get mount points: {e}")
+            common_paths = ['/home', '/media', '/mnt']
+            for path in common_paths:
+                if Path(path).exists():
+                    drives.append({'path': path, 'name': path, 'type': 'local'})
+    return drives
+
+
+def _get_drives_cached():
+    """Encoded drive list response and its ETag, rescanned at most once per _DRIVES_CACHE_TTL seconds"""
+    if time.monotonic() - _drives_cache['ts'] < _DRIVES_CACHE_TTL:
+        return _drives_cache['val']
+    with _drives_lock:
+        # Another request may have rescanned while we waited for the lock
+        if time.monotonic() - _drives_cache['ts'] < _DRIVES_CACHE_TTL:
+            return _drives_cache['val']
+        body = dumps_bytes({'success': True, 'drives': _scan_drives()})
+        _drives_cache['val'] = (body, _etag(body))
+        _drives_cache['ts'] = time.monotonic()
+        return _drives_cache['val']
+
+
+def _get_client_drives_by_id(drive_manager, user_id, client_id):
+    """Client's drives keyed by id, fetched once per request ({} if unavailable)"""
+    if not drive_manager:
+        return {}
+    try:
+        return {drive.id: drive for drive in drive_manager.get_client_drives(user_id, client_id)}
+    except Exception as e:
+        logger.debug(f"Could not get drive info: {e}")
+        return {}
+
+
+def _dest_to_dict(dest):
+    """Wire format of a Destination (datetimes are ISO-encoded by json_codec.dumps_bytes)"""
+    return {
+        'id': dest.id,
+        'path': dest.path,
+        'category': dest.category,
+        'color': dest.color,
+        'drive_id': dest.drive_id,
+        'usage_count': dest.usage_count,
+        'last_used_at': dest.last_used_at,
+        'created_at': dest.created_at,
+        'is_active': dest.is_active
+    }
+
+
+def _iter_destinations_json(destinations, drives_by_id, with_availability=False):
+    """
+    Encode {"success": true, "destinations": [...]} one destination at a time.
+    
+    Args:
+        destinations: Destination objects
+        drives_by_id: Client drives keyed by id (see _get_client_drives_by_id)
+        with_availability: Also report each destination's drive is_available flag
+    """
+    yield b'{"success":true,"destinations":['
+    for index, dest in enumerate(destinations):
+        dest_dict = _dest_to_dict(dest)
+        
+        # Add drive information if available
+        drive = drives_by_id.get(dest.drive_id) if dest.drive_id else None
+        if drive:
+            dest_dict['drive_type'] = drive.drive_type
+            dest_dict['drive_label'] = drive.volume_label
+            dest_dict['cloud_provider'] = drive.cloud_provider
+            if with_availability:
+                dest_dict['is_available'] = drive.is_available
+        
+        yield (b',' if index else b'') + dumps_bytes(dest_dict)
+    yield b']}'
+
+
+def _etag(body: bytes) -> str:
+    """Cheap content hash of an encoded response body for ETag/If-None-Match"""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
 def register_destination_routes(app, web_server):
     """Register destination management routes with the Flask app"""
 
     def _get_destination_manager():
         """Get DestinationMemoryManager instance"""
         try:
-            file_organizer_app = web_server.app_manager.get_module('file_organizer')
-            if file_organizer_app and hasattr(file_organizer_app, 'path_memory_manager'):
-                path_mgr = file_organizer_app.path_memory_manager
-                if hasattr(path_mgr, '_destination_manager'):
-                    return path_mgr._destination_manager
+            return web_server._get_file_organizer_manager('_destination_manager')
         except Exception as e:
             logger.warning(f"Could not get DestinationMemoryManager: {e}")
         return None
@@ -30,15 +188,27 @@ def register_destination_routes(app, web_server):
     def _get_drive_manager():
         """Get DriveManager instance"""
         try:
-            file_organizer_app = web_server.app_manager.get_module('file_organizer')
-            if file_organizer_app and hasattr(file_organizer_app, 'path_memory_manager'):
-                path_mgr = file_organizer_app.path_memory_manager
-                if hasattr(path_mgr, '_drive_manager'):
-                    return path_mgr._drive_manager
+            return web_server._get_file_organizer_manager('_drive_manager')
         except Exception as e:
             logger.warning(f"Could not get DriveManager: {e}")
         return None
 
+    def _fallback_destination_rows(user_id):
+        """(id, path, category) rows straight from destination_mappings"""
+        with web_server._fo_pool.read() as conn:
+            return conn.execute(_SELECT_DESTINATION_MAPPINGS_SQL, (user_id,)).fetchall()
+
+    def _fallback_delete_destination(destination_id):
+        """Hard-delete a destination_mappings row"""
+        with web_server._fo_pool.write() as conn:
+            conn.execute(_DELETE_DESTINATION_MAPPING_SQL, (destination_id,))
+
+    def _conditional_json(body, etag=None):
+        """JSON response tagged with an ETag; 304 without a body if the client already has it"""
+        response = app.response_class(body, mimetype='application/json')
+        response.set_etag(etag or _etag(body))
+        return response.make_conditional(request)
+
     @app.route('/api/file-organizer/destinations', methods=['GET', 'POST'])
     def fo_destinations():
         """Get or add destinations"""
@@ -59,64 +229,26 @@ def register_destination_routes(app, web_server):
             if not dest_manager:
                 # Fallback method
                 logger.warning("Using fallback destination retrieval")
-                conn = web_server._get_file_organizer_db_connection()
-                try:
-                    cursor = conn.execute("""
-                        SELECT id, destination_path, file_category
-                        FROM destination_mappings
-                        WHERE user_id = ?
-                        ORDER BY file_category ASC
-                    """, (user_id,))
-                    
-                    rows = cursor.fetchall()
-                    destinations = [{'id': row[0], 'path': row[1], 'name': row[2]} for row in rows]
-                    return jsonify({'success': True, 'destinations': destinations})
-                finally:
-                    conn.close()
+                rows = web_server._run_blocking(_fallback_destination_rows, user_id)
+                destinations = [{'id': id_, 'path': path, 'name': name} for id_, path, name in rows]
+                # Serialize directly (orjson when available) instead of through jsonify
+                return _conditional_json(dumps_bytes({'success': True, 'destinations': destinations}))
             
             # Use new DestinationMemoryManager
-            destinations = dest_manager.get_destinations_for_client(user_id, client_id)
+            destinations = web_server._run_blocking(dest_manager.get_destinations_for_client, user_id, client_id)
+            drives_by_id = web_server._run_blocking(_get_client_drives_by_id, drive_manager, user_id, client_id)
             
-            # Format response
-            result = []
-            for dest in destinations:
-                dest_dict = {
-                    'id': dest.id,
-                    'path': dest.path,
-                    'category': dest.category,
-                    'color': dest.color,  # Include color
-                    'drive_id': dest.drive_id,
-                    'usage_count': dest.usage_count,
-                    'last_used_at': dest.last_used_at.isoformat() if dest.last_used_at else None,
-                    'created_at': dest.created_at.isoformat() if dest.created_at else None,
-                    'is_active': dest.is_active
-                }
-                
-                # Add drive information if available
-                if drive_manager and dest.drive_id:
-                    try:
-                        # Get drive info from client drives
-                        client_drives = drive_manager.get_client_drives(user_id, client_id)
-                        drive = next((d for d in client_drives if d.id == dest.drive_id), None)
-                        if drive:
-                            dest_dict['drive_type'] = drive.drive_type
-                            dest_dict['drive_label'] = drive.volume_label
-                            dest_dict['cloud_provider'] = drive.cloud_provider
-                    except Exception as e:
-                        logger.debug(f"Could not get drive info: {e}")
-                
-                result.append(dest_dict)
-            
-            return jsonify({'success': True, 'destinations': result})
+            # Format response (the ETag needs the whole body, so this one isn't streamed)
+            return _conditional_json(b''.join(_iter_destinations_json(destinations, drives_by_id)))
             
         except Exception as e:
             logger.error(f"GET /destinations error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
 
     def _add_destination():
         """Manually add a new destination"""
         try:
-            data = request.get_json(force=True, silent=True) or {}
+            data = request_json()
             user_id = data.get('user_id', 'dev_user')
             client_id = data.get('client_id', 'default_client')
             path = data.get('path')
@@ -125,88 +257,53 @@ def register_destination_routes(app, web_server):
             
             # Validate required fields
             if not path:
-                return jsonify({'success': False, 'error': 'path is required'}), 400
+                return json_response({'success': False, 'error': 'path is required'}, 400)
             if not category:
-                return jsonify({'success': False, 'error': 'category is required'}), 400
+                return json_response({'success': False, 'error': 'category is required'}, 400)
             
-            # Validate path exists
-            if not os.path.exists(path):
-                return jsonify({'success': False, 'error': f'Path does not exist: {path}'}), 400
+            # Validate path exists (run off the hub in case a remote mount stalls)
+            if not web_server._run_blocking(os.path.exists, path):
+                return json_response({'success': False, 'error': f'Path does not exist: {path}'}, 400)
             
             dest_manager = _get_destination_manager()
             drive_manager = _get_drive_manager()
             
             if not dest_manager:
-                return jsonify({'success': False, 'error': 'DestinationMemoryManager not available'}), 500
+                return json_response({'success': False, 'error': 'DestinationMemoryManager not available'}, 500)
             
             # Determine drive_id
             drive_id = None
             if drive_manager:
                 try:
-                    drive = drive_manager.get_drive_for_path(user_id, path, client_id)
+                    drive = web_server._run_blocking(drive_manager.get_drive_for_path, user_id, path, client_id)
                     if drive:
                         drive_id = drive.id
                 except Exception as e:
                     logger.warning(f"Could not determine drive_id: {e}")
             
             # Add destination (with optional color)
-            destination = dest_manager.add_destination(user_id, path, category, client_id, drive_id, color)
+            destination = web_server._run_blocking(
+                dest_manager.add_destination, user_id, path, category, client_id, drive_id, color
+            )
             
             if not destination:
-                return jsonify({'success': False, 'error': 'Failed to add destination'}), 500
+                return json_response({'success': False, 'error': 'Failed to add destination'}, 500)
             
-            # Format response
-            result = {
-                'id': destination.id,
-                'path': destination.path,
-                'category': destination.category,
-                'color': destination.color,  # Include color in response
-                'drive_id': destination.drive_id,
-                'usage_count': destination.usage_count,
-                'created_at': destination.created_at.isoformat() if destination.created_at else None,
-                'is_active': destination.is_active
-            }
-            
-            return jsonify({'success': True, 'destination': result}), 201
+            return json_response({'success': True, 'destination': _dest_to_dict(destination)}, 201)
             
         except Exception as e:
             logger.error(f"POST /destinations error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
 
     @app.route('/api/file-organizer/get-drives', methods=['GET'])
     def fo_get_drives():
         """Get available drives/mount points"""
         try:
-            drives = []
-            system = platform.system()
-            
-            if system == 'Windows':
-                import string
-                for letter in string.ascii_uppercase:
-                    drive = f"{letter}:\\"
-                    if Path(drive).exists():
-                        drives.append({'path': drive, 'name': f"Drive {letter}:", 'type': 'local'})
-            else:
-                try:
-                    result = subprocess.run(['df', '-h'], capture_output=True, text=True)
-                    lines = result.stdout.strip().split('\n')[1:]
-                    for line in lines:
-                        parts = line.split()
-                        if len(parts) >= 6:
-                            mount_point = parts[5]
-                            if mount_point.startswith(('/home', '/media', '/mnt')) or mount_point == '/':
-                                drives.append({'path': mount_point, 'name': mount_point, 'type': 'local'})
-                except Exception as e:
-                    logger.warning(f"Could not get mount points: {e}")
-                    common_paths = ['/home', '/media', '/mnt']
-                    for path in common_paths:
-                        if Path(path).exists():
-                            drives.append({'path': path, 'name': path, 'type': 'local'})
-            
-            return jsonify({'success': True, 'drives': drives})
+            body, etag = _get_drives_cached()
+            return _conditional_json(body, etag)
         except Exception as e:
             logger.error(f"/get-drives error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
 
     @app.route('/api/file-organizer/destinations/<destination_id>', methods=['DELETE', 'PUT'])
     def fo_manage_destination(destination_id):
@@ -222,52 +319,48 @@ def register_destination_routes(app, web_server):
             user_id = request.args.get('user_id', 'dev_user')
             
             if not destination_id:
-                return jsonify({'success': False, 'error': 'destination_id required'}), 400
+                return json_response({'success': False, 'error': 'destination_id required'}, 400)
             
             dest_manager = _get_destination_manager()
             
             if not dest_manager:
                 # Fallback method
                 logger.warning("Using fallback destination deletion")
-                conn = web_server._get_file_organizer_db_connection()
-                try:
-                    conn.execute("DELETE FROM destination_mappings WHERE id = ?", (destination_id,))
-                    conn.commit()
-                    return jsonify({'success': True, 'message': 'Destination removed successfully'})
-                finally:
-                    conn.close()
+                web_server._run_blocking(_fallback_delete_destination, destination_id)
+                return json_response({'success': True, 'message': 'Destination removed successfully'})
             
             # Use new DestinationMemoryManager (soft delete)
-            success = dest_manager.remove_destination(user_id, destination_id)
+            success = web_server._run_blocking(dest_manager.remove_destination, user_id, destination_id)
             
             if success:
-                return jsonify({'success': True, 'message': 'Destination removed successfully'})
+                return json_response({'success': True, 'message': 'Destination removed successfully'})
             else:
-                return jsonify({'success': False, 'error': 'Destination not found'}), 404
+                return json_response({'success': False, 'error': 'Destination not found'}, 404)
                 
         except Exception as e:
             logger.error(f"DELETE /destinations/{destination_id} error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
     
     def _update_destination(destination_id):
         """Update a destination's properties"""
         try:
-            data = request.get_json(force=True, silent=True) or {}
+            data = request_json()
             user_id = data.get('user_id', 'dev_user')
             path = data.get('path')
             category = data.get('category')
             color = data.get('color')
             
             if not destination_id:
-                return jsonify({'success': False, 'error': 'destination_id required'}), 400
+                return json_response({'success': False, 'error': 'destination_id required'}, 400)
             
             dest_manager = _get_destination_manager()
             
             if not dest_manager:
-                return jsonify({'success': False, 'error': 'DestinationMemoryManager not available'}), 500
+                return json_response({'success': False, 'error': 'DestinationMemoryManager not available'}, 500)
             
             # Update destination
-            destination = dest_manager.update_destination(
+            destination = web_server._run_blocking(
+                dest_manager.update_destination,
                 user_id=user_id,
                 destination_id=destination_id,
                 path=path,
@@ -276,38 +369,34 @@ def register_destination_routes(app, web_server):
             )
             
             if not destination:
-                return jsonify({'success': False, 'error': 'Failed to update destination or destination not found'}), 404
+                return json_response({'success': False, 'error': 'Failed to update destination or destination not found'}, 404)
             
-            # Format response
-            result = {
-                'id': destination.id,
-                'path': destination.path,
-                'category': destination.category,
-                'color': destination.color,
-                'drive_id': destination.drive_id,
-                'usage_count': destination.usage_count,
-                'last_used_at': destination.last_used_at.isoformat() if destination.last_used_at else None,
-                'created_at': destination.created_at.isoformat() if destination.created_at else None,
-                'is_active': destination.is_active
-            }
-            
-            return jsonify({'success': True, 'destination': result})
+            return json_response({'success': True, 'destination': _dest_to_dict(destination)})
             
         except Exception as e:
             logger.error(f"PUT /destinations/{destination_id} error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
 
     @app.route('/api/file-organizer/destinations/capture', methods=['POST'])
     def fo_capture_destinations():
         """Auto-capture destinations from file operations"""
         try:
-            data = request.get_json(force=True, silent=True) or {}
+            # Refuse oversized bodies before parsing them
+            if request.content_length and request.content_length > MAX_CAPTURE_BODY_BYTES:
+                return json_response({'success': False, 'error': 'Request body too large'}, 413)
+            
+            data = request_json()
             user_id = data.get('user_id', 'dev_user')
             client_id = data.get('client_id', 'default_client')
             operations = data.get('operations', [])
             
             if not operations:
-                return jsonify({'success': True, 'destinations': []})
+                return json_response({'success': True, 'destinations': []})
+            if len(operations) > MAX_CAPTURE_OPERATIONS:
+                return json_response({
+                    'success': False,
+                    'error': f'Too many operations ({len(operations)}), maximum is {MAX_CAPTURE_OPERATIONS}'
+                }, 413)
             
             logger.info(f"📸 Capture request received: {len(operations)} operations")
             
@@ -316,21 +405,14 @@ def register_destination_routes(app, web_server):
             
             if not dest_manager:
                 logger.error("DestinationMemoryManager not available")
-                return jsonify({'success': False, 'error': 'DestinationMemoryManager not available'}), 500
+                return json_response({'success': False, 'error': 'DestinationMemoryManager not available'}, 500)
             
-            # Convert operations to the format expected by auto_capture
-            formatted_ops = []
-            for op in operations:
-                formatted_ops.append({
-                    'source': op.get('source'),
-                    'destination': op.get('destination'),
-                    'type': op.get('type', 'move')
-                })
-            
-            logger.info(f"🔍 Formatted operations: {formatted_ops}")
+            # auto_capture only reads each operation's destination; feed them lazily
+            formatted_ops = ({'destination': op.get('destination')} for op in operations)
             
             # Auto-capture destinations
-            captured_destinations = dest_manager.auto_capture_destinations(
+            captured_destinations = web_server._run_blocking(
+                dest_manager.auto_capture_destinations,
                 user_id=user_id,
                 operations=formatted_ops,
                 client_id=client_id
@@ -339,40 +421,19 @@ def register_destination_routes(app, web_server):
             logger.info(f"✅ Captured {len(captured_destinations)} destinations")
             
             # Format response
-            result = []
-            for dest in captured_destinations:
-                dest_dict = {
-                    'id': dest.id,
-                    'path': dest.path,
-                    'category': dest.category,
-                    'color': dest.color,  # Include color
-                    'drive_id': dest.drive_id,
-                    'usage_count': dest.usage_count,
-                    'last_used_at': dest.last_used_at.isoformat() if dest.last_used_at else None,
-                    'created_at': dest.created_at.isoformat() if dest.created_at else None,
-                    'is_active': dest.is_active
-                }
-                
-                # Add drive information if available
-                if drive_manager and dest.drive_id:
-                    try:
-                        client_drives = drive_manager.get_client_drives(user_id, client_id)
-                        drive = next((d for d in client_drives if d.id == dest.drive_id), None)
-                        if drive:
-                            dest_dict['drive_type'] = drive.drive_type
-                            dest_dict['drive_label'] = drive.volume_label
-                            dest_dict['cloud_provider'] = drive.cloud_provider
-                            dest_dict['is_available'] = drive.is_available
-                    except Exception as e:
-                        logger.debug(f"Could not get drive info: {e}")
-                
-                result.append(dest_dict)
-            
-            return jsonify({'success': True, 'destinations': result})
+            drives_by_id = (
+                web_server._run_blocking(_get_client_drives_by_id, drive_manager, user_id, client_id)
+                if captured_destinations else {}
+            )
+            # Stream the encoded destinations instead of building the whole list first
+            return app.response_class(
+                _iter_destinations_json(captured_destinations, drives_by_id, with_availability=True),
+                mimetype='application/json'
+            )
             
         except Exception as e:
             logger.error(f"POST /destinations/capture error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
 
 
 
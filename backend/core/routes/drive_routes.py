@@ -5,17 +5,214 @@ Drive Routes - Drive management endpoints
 
 import logging
 import os
-from flask import request, jsonify
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import request
+
+from core.json_codec import dumps_bytes, json_response, request_json
 
 logger = logging.getLogger('DriveRoutes')
 
 
+# Free space changes slowly; repeated /drives polls reuse recent statvfs results
+_SPACE_CACHE_TTL = 5.0
+_SPACE_CACHE_MAX_ENTRIES = 1024
+_space_cache = {}  # mount_point -> (monotonic timestamp, available GB or None)
+_space_lock = threading.Lock()
+
+# statvfs releases the GIL, so mounts are measured in parallel; a hung network mount
+# is reported as unknown after the timeout instead of stalling the whole response,
+# and isn't measured again until its outstanding statvfs returns
+_SPACE_PREFETCH_TIMEOUT = 2.0
+_space_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='drive-space')
+_space_pending = set()  # mount points with a statvfs in flight
+
+
+def _space_is_fresh(mount_point: str) -> bool:
+    cached = _space_cache.get(mount_point)
+    return bool(cached) and time.monotonic() - cached[0] < _SPACE_CACHE_TTL
+
+
+def _store_available_space(mount_point: str, available_gb, only_if_stale: bool = False):
+    with _space_lock:
+        if only_if_stale and _space_is_fresh(mount_point):
+            return
+        if len(_space_cache) >= _SPACE_CACHE_MAX_ENTRIES:
+            # Mount points come from clients, so keep the cache bounded
+            now = time.monotonic()
+            for key in [key for key, (ts, _) in _space_cache.items() if now - ts >= _SPACE_CACHE_TTL]:
+                del _space_cache[key]
+            if len(_space_cache) >= _SPACE_CACHE_MAX_ENTRIES:
+                _space_cache.clear()
+        _space_cache[mount_point] = (time.monotonic(), available_gb)
+
+
+def _claim_measurement(mount_point: str) -> bool:
+    """Mark a stale mount point as being measured; False if fresh or already in flight"""
+    with _space_lock:
+        if mount_point in _space_pending or _space_is_fresh(mount_point):
+            return False
+        _space_pending.add(mount_point)
+        return True
+
+
+def _refresh_available_space(mount_point: str) -> float:
+    """Measure a claimed mount point and cache the result"""
+    try:
+        available_gb = _measure_available_space(mount_point)
+        _store_available_space(mount_point, available_gb)
+        return available_gb
+    finally:
+        with _space_lock:
+            _space_pending.discard(mount_point)
+
+
+def _get_available_space(mount_point: str) -> float:
+    """Get available space in GB for a mount point, measured at most once per _SPACE_CACHE_TTL seconds"""
+    if not _claim_measurement(mount_point):
+        # Fresh, or a statvfs is still stuck on it: answer from the cache without a syscall
+        cached = _space_cache.get(mount_point)
+        return cached[1] if cached else None
+    return _refresh_available_space(mount_point)
+
+
+def _space_mount_points(drive):
+    """Mount points worth measuring for a drive: skip the drive/mounts reported as unavailable"""
+    if drive.is_available:
+        yield drive.mount_point
+    for mount in drive.client_mounts or ():
+        if mount.is_available:
+            yield mount.mount_point
+
+
+def _prefetch_available_space(drives):
+    """
+    Measure the stale mount points of these drives (and their client mounts) in parallel,
+    so formatting them afterwards only reads the cache.
+    """
+    mount_points = {mount_point for drive in drives for mount_point in _space_mount_points(drive)}
+    futures = {
+        _space_executor.submit(_refresh_available_space, mount_point): mount_point
+        for mount_point in mount_points if _claim_measurement(mount_point)
+    }
+    if not futures:
+        return
+    _, not_done = wait(futures, timeout=_SPACE_PREFETCH_TIMEOUT)
+    for future in not_done:
+        mount_point = futures[future]
+        logger.warning(f"⏱️ Free space for {mount_point} not available within {_SPACE_PREFETCH_TIMEOUT}s")
+        # Unknown for now; the measurement overwrites this once it finishes
+        _store_available_space(mount_point, None, only_if_stale=True)
+
+
+def _measure_available_space(mount_point: str) -> float:
+    """statvfs a mount point; available GB rounded to 0.1, or None if it can't be measured"""
+    try:
+        # statvfs reports a missing path itself; no separate exists() stat
+        stat = os.statvfs(mount_point)
+        available_bytes = stat.f_bavail * stat.f_frsize
+        available_gb = available_bytes / (1024 ** 3)
+        return round(available_gb, 1)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug(f"Could not get available space for {mount_point}: {e}")
+        return None
+
+
+def _mount_to_dict(mount, space_fn=_get_available_space):
+    """Wire format of a DriveClientMount, with free space when space_fn can tell"""
+    mount_dict = {
+        'client_id': mount.client_id,
+        'mount_point': mount.mount_point,
+        'is_available': mount.is_available,
+        'last_seen_at': mount.last_seen_at
+    }
+    # An unavailable mount point is an empty directory at best; its free space would be misleading
+    mount_space = space_fn(mount.mount_point) if mount.is_available else None
+    if mount_space is not None:
+        mount_dict['available_space_gb'] = mount_space
+    return mount_dict
+
+
+def _drive_to_dict(drive, space_fn=_get_available_space):
+    """
+    Wire format of a Drive (datetimes are ISO-encoded by json_codec.dumps_bytes)
+    
+    Args:
+        drive: Drive object
+        space_fn: mount_point -> available GB or None
+    """
+    drive_dict = {
+        'id': drive.id,
+        'unique_identifier': drive.unique_identifier,
+        'mount_point': drive.mount_point,
+        'volume_label': drive.volume_label,
+        'drive_type': drive.drive_type,
+        'cloud_provider': drive.cloud_provider,
+        'is_available': drive.is_available,
+        'last_seen_at': drive.last_seen_at,
+        'created_at': drive.created_at
+    }
+    
+    # Add available space (only for drives that are currently connected)
+    available_space = space_fn(drive.mount_point) if drive.is_available else None
+    if available_space is not None:
+        drive_dict['available_space_gb'] = available_space
+    
+    # Add client mounts information
+    if drive.client_mounts:
+        drive_dict['client_mounts'] = [_mount_to_dict(mount, space_fn) for mount in drive.client_mounts]
+    return drive_dict
+
+
+def _normalize_drive_info(drive_data):
+    """Drive info from a client report in the shape DriveManager registers"""
+    mount_point = drive_data.get('mount_point')
+    unique_id = drive_data.get('unique_identifier')
+    
+    # If unique_identifier is empty or same as mount_point, use mount_point as identifier
+    # This is common for internal drives where we don't have a hardware UUID
+    if not unique_id or unique_id == mount_point:
+        unique_id = f"mount:{mount_point}"  # Prefix to make it clear it's a mount-based ID
+    
+    return {
+        'unique_identifier': unique_id,
+        'mount_point': mount_point,
+        'volume_label': drive_data.get('volume_label') or mount_point,  # Use mount_point as fallback label
+        'drive_type': drive_data.get('drive_type'),
+        'cloud_provider': drive_data.get('cloud_provider')
+    }
+
+
+def _iter_drives_json(drives, with_count=False):
+    """
+    Encode {"success": true, "drives": [...]} one drive at a time.
+    
+    Args:
+        drives: Drive objects (free space should already be prefetched)
+        with_count: Append the number of drives as "count"
+    """
+    yield b'{"success":true,"drives":['
+    for index, drive in enumerate(drives):
+        yield (b',' if index else b'') + dumps_bytes(_drive_to_dict(drive))
+    yield b'],"count":%d}' % len(drives) if with_count else b']}'
+
+
 def register_drive_routes(app, web_server):
     """Register drive management routes with the Flask app"""
 
     def _get_drive_manager():
         """Get DriveManager instance"""
         try:
+            # Fast path: module running and its manager already resolved (two dict lookups)
+            if 'file_organizer' in web_server.app_manager.active_modules:
+                drive_manager = web_server._get_file_organizer_manager('_drive_manager')
+                if drive_manager is not None:
+                    return drive_manager
+            
+            # Slow path: explain why there's no manager
             file_organizer_app = web_server.app_manager.get_module('file_organizer')
             if not file_organizer_app:
                 logger.warning("FileOrganizerApp not found")
@@ -27,32 +224,14 @@ def register_drive_routes(app, web_server):
                 logger.warning("FileOrganizerApp not started - module needs to be started first")
                 return None
             
-            if hasattr(file_organizer_app, 'path_memory_manager'):
-                path_mgr = file_organizer_app.path_memory_manager
-                if hasattr(path_mgr, '_drive_manager'):
-                    return path_mgr._drive_manager
-                else:
-                    logger.warning("PathMemoryManager has no _drive_manager attribute")
-            else:
-                logger.warning("FileOrganizerApp has no path_memory_manager attribute")
+            drive_manager = web_server._get_file_organizer_manager('_drive_manager')
+            if drive_manager is None:
+                logger.warning("FileOrganizerApp has no PathMemoryManager DriveManager")
+            return drive_manager
         except Exception as e:
             logger.error(f"Could not get DriveManager: {e}", exc_info=True)
         return None
 
-    def _get_available_space(mount_point: str) -> float:
-        """Get available space in GB for a mount point"""
-        try:
-            if not os.path.exists(mount_point):
-                return None
-            
-            stat = os.statvfs(mount_point)
-            available_bytes = stat.f_bavail * stat.f_frsize
-            available_gb = available_bytes / (1024 ** 3)
-            return round(available_gb, 1)
-        except Exception as e:
-            logger.debug(f"Could not get available space for {mount_point}: {e}")
-            return None
-
     @app.route('/api/file-organizer/drives', methods=['GET', 'POST'])
     def fo_drives():
         """Get or register drives (deprecated for POST - use /drives/batch instead)"""
@@ -74,233 +253,139 @@ def register_drive_routes(app, web_server):
             drive_manager = _get_drive_manager()
             
             if not drive_manager:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'DriveManager not available'
-                }), 500
+                }, 500)
             
             # Get all drives for user
-            drives = drive_manager.get_drives(user_id)
-            
-            # Format response
-            result = []
-            for drive in drives:
-                drive_dict = {
-                    'id': drive.id,
-                    'unique_identifier': drive.unique_identifier,
-                    'mount_point': drive.mount_point,
-                    'volume_label': drive.volume_label,
-                    'drive_type': drive.drive_type,
-                    'cloud_provider': drive.cloud_provider,
-                    'is_available': drive.is_available,
-                    'last_seen_at': drive.last_seen_at.isoformat() if drive.last_seen_at else None,
-                    'created_at': drive.created_at.isoformat() if drive.created_at else None
-                }
-                
-                # Add available space
-                available_space = _get_available_space(drive.mount_point)
-                if available_space is not None:
-                    drive_dict['available_space_gb'] = available_space
-                
-                # Add client mounts information
-                if drive.client_mounts:
-                    drive_dict['client_mounts'] = []
-                    for mount in drive.client_mounts:
-                        mount_dict = {
-                            'client_id': mount.client_id,
-                            'mount_point': mount.mount_point,
-                            'is_available': mount.is_available,
-                            'last_seen_at': mount.last_seen_at.isoformat() if mount.last_seen_at else None
-                        }
-                        # Get space for this specific mount point
-                        mount_space = _get_available_space(mount.mount_point)
-                        if mount_space is not None:
-                            mount_dict['available_space_gb'] = mount_space
-                        drive_dict['client_mounts'].append(mount_dict)
-                
-                result.append(drive_dict)
+            drives = web_server._run_blocking(drive_manager.get_drives, user_id)
+            web_server._run_blocking(_prefetch_available_space, drives)
             
-            return jsonify({'success': True, 'drives': result})
+            return app.response_class(_iter_drives_json(drives), mimetype='application/json')
             
         except Exception as e:
             logger.error(f"GET /drives error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
 
     def _register_drive():
         """Register a new drive detected by frontend (deprecated - use batch endpoint)"""
         try:
-            data = request.get_json(force=True, silent=True) or {}
+            data = request_json()
             user_id = data.get('user_id', 'dev_user')
             client_id = data.get('client_id', 'default_client')
             
             # Log what we received for debugging
             logger.debug(f"Drive registration request: {data}")
             
-            # Extract drive info
-            unique_id = data.get('unique_identifier')
-            mount_point = data.get('mount_point')
-            
             # Validate mount_point first
+            mount_point = data.get('mount_point')
             if not mount_point:
                 logger.warning(f"Drive registration missing mount_point: {data}")
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'mount_point is required'
-                }), 400
+                }, 400)
             
-            # If unique_identifier is empty or same as mount_point, use mount_point as identifier
-            # This is common for internal drives where we don't have a hardware UUID
-            if not unique_id or unique_id == mount_point:
-                unique_id = f"mount:{mount_point}"  # Prefix to make it clear it's a mount-based ID
-            
-            drive_info = {
-                'unique_identifier': unique_id,
-                'mount_point': mount_point,
-                'volume_label': data.get('volume_label') or mount_point,  # Use mount_point as fallback label
-                'drive_type': data.get('drive_type'),
-                'cloud_provider': data.get('cloud_provider')
-            }
+            drive_info = _normalize_drive_info(data)
             
             if not drive_info['drive_type']:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'drive_type is required'
-                }), 400
+                }, 400)
             
             drive_manager = _get_drive_manager()
             
             if not drive_manager:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'DriveManager not available'
-                }), 500
+                }, 500)
             
             # Register drive
-            drive = drive_manager.register_drive(user_id, drive_info, client_id)
+            drive = web_server._run_blocking(drive_manager.register_drive, user_id, drive_info, client_id)
             
             if not drive:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'Failed to register drive'
-                }), 500
-            
-            # Format response
-            result = {
-                'id': drive.id,
-                'unique_identifier': drive.unique_identifier,
-                'mount_point': drive.mount_point,
-                'volume_label': drive.volume_label,
-                'drive_type': drive.drive_type,
-                'cloud_provider': drive.cloud_provider,
-                'is_available': drive.is_available,
-                'last_seen_at': drive.last_seen_at.isoformat() if drive.last_seen_at else None,
-                'created_at': drive.created_at.isoformat() if drive.created_at else None
-            }
-            
-            # Add available space
-            available_space = _get_available_space(drive.mount_point)
-            if available_space is not None:
-                result['available_space_gb'] = available_space
-            
-            # Add client mounts
-            if drive.client_mounts:
-                result['client_mounts'] = []
-                for mount in drive.client_mounts:
-                    result['client_mounts'].append({
-                        'client_id': mount.client_id,
-                        'mount_point': mount.mount_point,
-                        'is_available': mount.is_available,
-                        'last_seen_at': mount.last_seen_at.isoformat() if mount.last_seen_at else None
-                    })
-            
-            return jsonify({'success': True, 'drive': result}), 201
+                }, 500)
+            
+            web_server._run_blocking(_prefetch_available_space, [drive])
+            return json_response({'success': True, 'drive': _drive_to_dict(drive)}, 201)
             
         except Exception as e:
             logger.error(f"POST /drives error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
 
     def _register_drives_batch():
         """Register multiple drives in a single request with transaction support"""
         try:
-            data = request.get_json(force=True, silent=True) or {}
+            data = request_json()
             user_id = data.get('user_id', 'dev_user')
             client_id = data.get('client_id', 'default_client')
             drives_data = data.get('drives', [])
             
             # Validate input
             if not isinstance(drives_data, list):
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'drives must be an array'
-                }), 400
+                }, 400)
             
             if not drives_data:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'drives array cannot be empty'
-                }), 400
+                }, 400)
+            
+            if not all(isinstance(drive_data, dict) for drive_data in drives_data):
+                return json_response({
+                    'success': False,
+                    'error': 'each drive must be an object'
+                }, 400)
+            
+            # Normalize and drop repeated drives up front; the last report of a drive wins,
+            # as it would when the manager applied them in order
+            normalized = {}
+            for drive_data in drives_data:
+                drive_info = _normalize_drive_info(drive_data)
+                normalized[drive_info['unique_identifier']] = drive_info
+            if len(normalized) < len(drives_data):
+                logger.debug(f"Dropped {len(drives_data) - len(normalized)} duplicate drives from batch")
+            drives_data = list(normalized.values())
             
             logger.info(f"Batch drive registration: {len(drives_data)} drives from client {client_id}")
             
             drive_manager = _get_drive_manager()
             
             if not drive_manager:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'DriveManager not available'
-                }), 500
+                }, 500)
             
             # Process all drives in a batch
-            registered_drives = drive_manager.register_drives_batch(user_id, drives_data, client_id)
+            registered_drives = web_server._run_blocking(
+                drive_manager.register_drives_batch, user_id, drives_data, client_id
+            )
             
             if registered_drives is None:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'Failed to register drives'
-                }), 500
-            
-            # Format response
-            result = []
-            for drive in registered_drives:
-                drive_dict = {
-                    'id': drive.id,
-                    'unique_identifier': drive.unique_identifier,
-                    'mount_point': drive.mount_point,
-                    'volume_label': drive.volume_label,
-                    'drive_type': drive.drive_type,
-                    'cloud_provider': drive.cloud_provider,
-                    'is_available': drive.is_available,
-                    'last_seen_at': drive.last_seen_at.isoformat() if drive.last_seen_at else None,
-                    'created_at': drive.created_at.isoformat() if drive.created_at else None
-                }
-                
-                # Add available space
-                available_space = _get_available_space(drive.mount_point)
-                if available_space is not None:
-                    drive_dict['available_space_gb'] = available_space
-                
-                # Add client mounts
-                if drive.client_mounts:
-                    drive_dict['client_mounts'] = []
-                    for mount in drive.client_mounts:
-                        drive_dict['client_mounts'].append({
-                            'client_id': mount.client_id,
-                            'mount_point': mount.mount_point,
-                            'is_available': mount.is_available,
-                            'last_seen_at': mount.last_seen_at.isoformat() if mount.last_seen_at else None
-                        })
-                
-                result.append(drive_dict)
+                }, 500)
             
-            return jsonify({
-                'success': True,
-                'drives': result,
-                'count': len(result)
-            }), 201
+            web_server._run_blocking(_prefetch_available_space, registered_drives)
+            
+            return app.response_class(
+                _iter_drives_json(registered_drives, with_count=True), status=201, mimetype='application/json'
+            )
             
         except Exception as e:
             logger.error(f"POST /drives/batch error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
 
     @app.route('/api/file-organizer/drives/<drive_id>', methods=['GET'])
     def fo_get_drive(drive_id):
@@ -311,65 +396,31 @@ def register_drive_routes(app, web_server):
             drive_manager = _get_drive_manager()
             
             if not drive_manager:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'DriveManager not available'
-                }), 500
+                }, 500)
             
-            # Get all drives and find the one with matching ID
-            drives = drive_manager.get_drives(user_id)
-            drive = next((d for d in drives if d.id == drive_id), None)
+            drive = web_server._run_blocking(drive_manager.get_drive_by_id, user_id, drive_id)
             
             if not drive:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'Drive not found'
-                }), 404
-            
-            # Format response
-            result = {
-                'id': drive.id,
-                'unique_identifier': drive.unique_identifier,
-                'mount_point': drive.mount_point,
-                'volume_label': drive.volume_label,
-                'drive_type': drive.drive_type,
-                'cloud_provider': drive.cloud_provider,
-                'is_available': drive.is_available,
-                'last_seen_at': drive.last_seen_at.isoformat() if drive.last_seen_at else None,
-                'created_at': drive.created_at.isoformat() if drive.created_at else None
-            }
-            
-            # Add available space
-            available_space = _get_available_space(drive.mount_point)
-            if available_space is not None:
-                result['available_space_gb'] = available_space
-            
-            # Add client mounts
-            if drive.client_mounts:
-                result['client_mounts'] = []
-                for mount in drive.client_mounts:
-                    mount_dict = {
-                        'client_id': mount.client_id,
-                        'mount_point': mount.mount_point,
-                        'is_available': mount.is_available,
-                        'last_seen_at': mount.last_seen_at.isoformat() if mount.last_seen_at else None
-                    }
-                    mount_space = _get_available_space(mount.mount_point)
-                    if mount_space is not None:
-                        mount_dict['available_space_gb'] = mount_space
-                    result['client_mounts'].append(mount_dict)
-            
-            return jsonify({'success': True, 'drive': result})
+                }, 404)
+            
+            web_server._run_blocking(_prefetch_available_space, [drive])
+            return json_response({'success': True, 'drive': _drive_to_dict(drive)})
             
         except Exception as e:
             logger.error(f"GET /drives/{drive_id} error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
 
     @app.route('/api/file-organizer/drives/availability', methods=['PUT'])
     def fo_update_drive_availability():
         """Update drive availability status"""
         try:
-            data = request.get_json(force=True, silent=True) or {}
+            data = request_json()
             user_id = data.get('user_id', 'dev_user')
             client_id = data.get('client_id', 'default_client')
             unique_identifier = data.get('unique_identifier')
@@ -377,41 +428,41 @@ def register_drive_routes(app, web_server):
             
             # Validate required fields
             if not unique_identifier:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'unique_identifier is required'
-                }), 400
+                }, 400)
             
             if is_available is None:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'is_available is required'
-                }), 400
+                }, 400)
             
             drive_manager = _get_drive_manager()
             
             if not drive_manager:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'DriveManager not available'
-                }), 500
+                }, 500)
             
             # Update availability
-            success = drive_manager.update_drive_availability(
-                user_id, unique_identifier, is_available, client_id
+            success = web_server._run_blocking(
+                drive_manager.update_drive_availability, user_id, unique_identifier, is_available, client_id
             )
             
             if success:
-                return jsonify({
+                return json_response({
                     'success': True,
                     'message': 'Drive availability updated'
                 })
             else:
-                return jsonify({
+                return json_response({
                     'success': False,
                     'error': 'Drive not found'
-                }), 404
+                }, 404)
                 
         except Exception as e:
             logger.error(f"PUT /drives/availability error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
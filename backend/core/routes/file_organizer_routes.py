@@ -5,11 +5,58 @@ Handles: organize, execute, add-granularity
 """
 
 import logging
-from flask import request, jsonify
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from core.json_codec import dumps, json_response, request_json
+
 logger = logging.getLogger('FileOrganizerRoutes')
 
+# Independent file operations of one execute request run side by side; archive
+# extraction and copies spend their time in zlib/lzma and file I/O with the GIL released
+_step_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='fo-step')
+
+# Operation ids bound per IN (...) lookup; stays under SQLITE_MAX_VARIABLE_NUMBER on old builds
+_OPERATION_LOOKUP_CHUNK = 500
+
+
+def _operation_groups(rows):
+    """
+    Split (operation_type, source_path, destination_path) rows into groups that are safe
+    to run concurrently. Operations touching the same path, or a path inside another's
+    (e.g. an unpack target and a later move out of it), share a group. Each group lists
+    row indices in request order.
+    """
+    parent = list(range(len(rows)))
+    
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+    
+    touched = []
+    for index, (_, source, dest) in enumerate(rows):
+        for path in (source, dest):
+            if path:
+                touched.append((Path(os.path.normcase(os.path.abspath(path))).parts, index))
+    
+    # Sorted by components, every path directly follows its ancestors and equal paths
+    touched.sort()
+    ancestors = []
+    for parts, index in touched:
+        while ancestors and parts[:len(ancestors[-1][0])] != ancestors[-1][0]:
+            ancestors.pop()
+        if ancestors:
+            parent[find(index)] = find(ancestors[-1][1])
+        ancestors.append((parts, index))
+    
+    groups = {}
+    for index in range(len(rows)):
+        groups.setdefault(find(index), []).append(index)
+    return list(groups.values())
+
 
 def register_file_organizer_routes(app, web_server):
     """Register file organizer routes with the Flask app"""
@@ -89,7 +136,6 @@ def register_file_organizer_routes(app, web_server):
         """Execute file plans with multi-step atomic operations per file.
         Supports nested plans for extracted archive contents."""
         from datetime import datetime
-        import json
         
         user_id = data.get('user_id', 'dev_user')
         client_id = data.get('client_id', 'default_client')
@@ -121,7 +167,7 @@ def register_file_organizer_routes(app, web_server):
                     'error': None
                 }
                 
-                success, error = _execute_single_step(step, current_path)
+                success, error = web_server._run_blocking(_execute_single_step, step, current_path)
                 step_result['success'] = success
                 step_result['error'] = error
                 
@@ -162,7 +208,7 @@ def register_file_organizer_routes(app, web_server):
                             'error': None
                         }
                         
-                        success, error = _execute_single_step(nested_step, nested_current_path)
+                        success, error = web_server._run_blocking(_execute_single_step, nested_step, nested_current_path)
                         nested_step_result['success'] = success
                         nested_step_result['error'] = error
                         
@@ -209,12 +255,12 @@ def register_file_organizer_routes(app, web_server):
                                                 break
                 
                 if successful_ops:
-                    captured = dest_manager.auto_capture_destinations(
-                        user_id, successful_ops, client_id
+                    captured = web_server._run_blocking(
+                        dest_manager.auto_capture_destinations, user_id, successful_ops, client_id
                     )
                     
                     for dest in captured:
-                        dest_manager.update_usage(dest.id, file_count=1, operation_type='move')
+                        web_server._run_blocking(dest_manager.update_usage, dest.id, file_count=1, operation_type='move')
                     
                     new_destinations = [
                         {
@@ -245,7 +291,7 @@ def register_file_organizer_routes(app, web_server):
         if new_destinations:
             response['new_destinations_captured'] = new_destinations
         
-        return jsonify(response)
+        return json_response(response)
     
     def _execute_legacy_operations(data, analysis_id, operation_ids, web_server):
         """Execute operations using legacy format (backward compatibility)"""
@@ -254,103 +300,127 @@ def register_file_organizer_routes(app, web_server):
         user_id = data.get('user_id', 'dev_user')
         client_id = data.get('client_id', 'default_client')
         
-        conn = web_server._get_file_organizer_db_connection()
+        def _load_operations(op_ids):
+            rows_by_id = {}
+            with web_server._fo_pool.read() as conn:
+                for start in range(0, len(op_ids), _OPERATION_LOOKUP_CHUNK):
+                    chunk = op_ids[start:start + _OPERATION_LOOKUP_CHUNK]
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor = conn.execute(f"""
+                        SELECT operation_id, operation_type, source_path, destination_path
+                        FROM analysis_operations
+                        WHERE analysis_id = ? AND operation_id IN ({placeholders})
+                    """, (analysis_id, *chunk))
+                    for row in cursor:
+                        rows_by_id[row[0]] = row[1:]
+            return rows_by_id
         
-        try:
-            results = []
-            for op_id in operation_ids:
-                # Get operation details
-                cursor = conn.execute("""
-                    SELECT operation_type, source_path, destination_path
-                    FROM analysis_operations
-                    WHERE operation_id = ? AND analysis_id = ?
-                """, (op_id, analysis_id))
-                
-                row = cursor.fetchone()
-                if not row:
-                    results.append({'operation_id': op_id, 'success': False, 'error': 'Operation not found'})
-                    continue
-                
-                op_type, source, dest = row
-                
-                # Create a step object for execution
-                step = {
-                    'type': op_type,
-                    'target_path': dest
-                }
-                
-                success, error = _execute_single_step(step, source)
-                
-                if success:
-                    # Update operation status
-                    conn.execute("""
-                        UPDATE analysis_operations
-                        SET operation_status = 'applied', applied_at = ?
-                        WHERE operation_id = ?
-                    """, (datetime.now().isoformat(), op_id))
-                    
-                    results.append({'operation_id': op_id, 'success': True})
-                else:
-                    results.append({'operation_id': op_id, 'success': False, 'error': error})
-            
-            conn.commit()
+        def _mark_applied(applied):
+            with web_server._fo_pool.write() as conn:
+                conn.executemany("""
+                    UPDATE analysis_operations
+                    SET operation_status = 'applied', applied_at = ?
+                    WHERE operation_id = ?
+                """, [(applied_at, op_id) for op_id, applied_at in applied])
+        
+        def _run_operation(row):
+            op_type, source, dest = row
             
-            # Auto-capture destinations from successful operations
-            new_destinations = []
-            dest_manager = _get_destination_manager()
-            if dest_manager:
-                try:
-                    # Build operations list for auto-capture
-                    successful_ops = []
-                    for result in results:
-                        if result.get('success'):
-                            op_id = result['operation_id']
-                            cursor = conn.execute("""
-                                SELECT operation_type, destination_path
-                                FROM analysis_operations
-                                WHERE operation_id = ?
-                            """, (op_id,))
-                            row = cursor.fetchone()
-                            if row and row[1]:
-                                successful_ops.append({
-                                    'type': row[0],
-                                    'dest': row[1]
-                                })
+            # Create a step object for execution
+            step = {
+                'type': op_type,
+                'target_path': dest
+            }
+            return _execute_single_step(step, source)
+        
+        def _run_operations(rows):
+            groups = _operation_groups(rows)
+            if len(groups) < 2:
+                return [_run_operation(row) for row in rows]
+            
+            # Groups run side by side; operations within a group keep their order
+            def _run_group(indices):
+                return [(index, _run_operation(rows[index])) for index in indices]
+            
+            outcomes = [None] * len(rows)
+            for group_outcomes in _step_executor.map(_run_group, groups):
+                for index, outcome in group_outcomes:
+                    outcomes[index] = outcome
+            return outcomes
+        
+        # Get operation details in one lookup instead of a query per operation
+        rows_by_id = web_server._run_blocking(_load_operations, list(dict.fromkeys(operation_ids)))
+        
+        results = []
+        pending = []
+        results_by_id = {}
+        for op_id in operation_ids:
+            row = rows_by_id.get(op_id)
+            if not row:
+                results.append({'operation_id': op_id, 'success': False, 'error': 'Operation not found'})
+                continue
+            
+            # A repeated id is executed once and reported with the first outcome
+            if op_id in results_by_id:
+                results.append(results_by_id[op_id])
+                continue
+            
+            result = results_by_id[op_id] = {'operation_id': op_id}
+            results.append(result)
+            pending.append((result, row))
+        
+        # Execute non-overlapping file operations in parallel; DB writes stay out of the workers
+        outcomes = web_server._run_blocking(_run_operations, [row for _, row in pending])
+        
+        applied = []
+        applied_ops = []
+        applied_at = datetime.now().isoformat()
+        for (result, (op_type, source, dest)), (success, error) in zip(pending, outcomes):
+            result['success'] = success
+            if success:
+                applied.append((result['operation_id'], applied_at))
+                if dest:
+                    applied_ops.append({'type': op_type, 'dest': dest})
+            else:
+                result['error'] = error
+        
+        # Update operation status (the writer is only held once the files are done)
+        if applied:
+            web_server._run_blocking(_mark_applied, applied)
+        
+        # Auto-capture destinations from successful operations
+        new_destinations = []
+        dest_manager = _get_destination_manager()
+        if dest_manager:
+            try:
+                if applied_ops:
+                    captured = web_server._run_blocking(
+                        dest_manager.auto_capture_destinations, user_id, applied_ops, client_id
+                    )
                     
-                    if successful_ops:
-                        captured = dest_manager.auto_capture_destinations(
-                            user_id, successful_ops, client_id
-                        )
-                        
-                        for dest in captured:
-                            dest_manager.update_usage(dest.id, file_count=1, operation_type='move')
-                        
-                        new_destinations = [
-                            {
-                                'path': dest.path,
-                                'category': dest.category,
-                                'id': dest.id
-                            }
-                            for dest in captured
-                        ]
-                        
-                        if new_destinations:
-                            logger.info(f"Auto-captured {len(new_destinations)} new destination(s)")
-                
-                except Exception as capture_error:
-                    logger.warning(f"Could not auto-capture destinations: {capture_error}")
-            
-            response = {'success': True, 'results': results}
-            if new_destinations:
-                response['new_destinations_captured'] = new_destinations
-            
-            return jsonify(response)
+                    for dest in captured:
+                        web_server._run_blocking(dest_manager.update_usage, dest.id, file_count=1, operation_type='move')
+                    
+                    new_destinations = [
+                        {
+                            'path': dest.path,
+                            'category': dest.category,
+                            'id': dest.id
+                        }
+                        for dest in captured
+                    ]
+                    
+                    if new_destinations:
+                        logger.info(f"Auto-captured {len(new_destinations)} new destination(s)")
             
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            conn.close()
+            except Exception as capture_error:
+                logger.warning(f"Could not auto-capture destinations: {capture_error}")
+        
+        response = {'success': True, 'results': results}
+        if new_destinations:
+            response['new_destinations_captured'] = new_destinations
+        
+        return json_response(response)
     
     def _build_file_plan(file_path, file_result, src_path, dest_root, analysis_id, user_id=None, client_id=None):
         """
@@ -567,6 +637,60 @@ def register_file_organizer_routes(app, web_server):
         
         return plan
     
+    def _save_analysis_session(analysis_id, user_id, source_folder, destination_folder,
+                               organization_style, session_metadata, operations):
+        """Persist an analysis session and its pending operations.
+        Blocking SQLite work - call through web_server._run_blocking."""
+        from datetime import datetime
+        
+        now = datetime.now().isoformat()
+        
+        rows = []
+        for idx, op in enumerate(operations):
+            operation_id = f"{analysis_id}_op_{idx}"
+            rows.append((
+                operation_id,
+                analysis_id,
+                op['type'],
+                op['source'],
+                op['destination'],
+                Path(op['source']).name,
+                'pending',
+                '{}'
+            ))
+            # Add operation_id to response
+            op['operation_id'] = operation_id
+            op['status'] = 'pending'
+        
+        # The pooled writer runs everything in one BEGIN IMMEDIATE transaction
+        with web_server._fo_pool.write() as conn:
+            # Insert analysis session
+            conn.execute("""
+                INSERT INTO analysis_sessions 
+                (analysis_id, user_id, source_path, destination_path, organization_style, 
+                 file_count, created_at, updated_at, status, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                analysis_id,
+                user_id,
+                source_folder,
+                destination_folder,
+                organization_style,
+                len(operations),
+                now,
+                now,
+                'pending',
+                dumps(session_metadata)
+            ))
+            
+            # Insert operations
+            conn.executemany("""
+                INSERT INTO analysis_operations
+                (operation_id, analysis_id, operation_type, source_path, destination_path,
+                 file_name, operation_status, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+    
     def _get_ai_context_builder():
         """Get AIContextBuilder instance"""
         try:
@@ -583,11 +707,7 @@ def register_file_organizer_routes(app, web_server):
     def _get_destination_manager():
         """Get DestinationMemoryManager instance"""
         try:
-            file_organizer_app = web_server.app_manager.get_module('file_organizer')
-            if file_organizer_app and hasattr(file_organizer_app, 'path_memory_manager'):
-                path_mgr = file_organizer_app.path_memory_manager
-                if hasattr(path_mgr, '_destination_manager'):
-                    return path_mgr._destination_manager
+            return web_server._get_file_organizer_manager('_destination_manager')
         except Exception as e:
             logger.warning(f"Could not get DestinationMemoryManager: {e}")
         return None
@@ -595,7 +715,7 @@ def register_file_organizer_routes(app, web_server):
     @app.route('/api/file-organizer/organize', methods=['POST'])
     def fo_organize():
         try:
-            data = request.get_json(force=True, silent=True) or {}
+            data = request_json()
             
             # Parse and validate request using Pydantic model
             from file_organizer.request_models import OrganizeRequest
@@ -632,26 +752,23 @@ def register_file_organizer_routes(app, web_server):
                 files_metadata = {}
 
             if not source_folder:
-                return jsonify({'success': False, 'error': 'source_path required'}), 400
+                return json_response({'success': False, 'error': 'source_path required'}, 400)
             if not destination_folder:
-                return jsonify({'success': False, 'error': 'destination_path required'}), 400
+                return json_response({'success': False, 'error': 'destination_path required'}, 400)
 
             # Get the File Organizer App instance
             app_manager = web_server.components.get('app_manager')
             if not app_manager:
-                return jsonify({'success': False, 'error': 'app_manager_unavailable'}), 500
+                return json_response({'success': False, 'error': 'app_manager_unavailable'}, 500)
             
             # For now, bypass the module system and work directly with the database
             # This is a temporary solution until we fix the async module startup
             pass
 
-            # until the AI generator is fully re-integrated.
-            from file_organizer.ai_content_analyzer import AIContentAnalyzer
-            
             src_path = Path(source_folder).expanduser()
             dest_root = Path(destination_folder).expanduser()
             if not src_path.exists() or not src_path.is_dir():
-                return jsonify({'success': False, 'error': f'source_folder not found: {source_folder}'}), 400
+                return json_response({'success': False, 'error': f'source_folder not found: {source_folder}'}, 400)
 
             # Use provided file paths if available (includes nested files from frontend)
             # Otherwise, scan only root-level files (legacy behavior)
@@ -661,22 +778,25 @@ def register_file_organizer_routes(app, web_server):
                 files = [Path(fp) for fp in file_paths if Path(fp).exists() and Path(fp).is_file()]
             else:
                 logger.info(f"Scanning root-level files in {source_folder}")
-                files = [p for p in src_path.iterdir() if p.is_file()]
-                file_paths = [str(f) for f in files]
+                # DirEntry.is_file() answers from the dirent type, no stat per entry
+                with os.scandir(src_path) as entries:
+                    file_paths = [entry.path for entry in entries if entry.is_file()]
+                files = [Path(fp) for fp in file_paths]
             
             logger.info(f"Processing {len(file_paths)} files for organization")
             
             # Get existing folders in destination for context-aware organization
             existing_folders = []
             if dest_root.exists():
-                existing_folders = [d.name for d in dest_root.iterdir() if d.is_dir()]
+                with os.scandir(dest_root) as entries:
+                    existing_folders = [entry.name for entry in entries if entry.is_dir()]
             
             # Build AI context with known destinations and drives
             ai_context_text = None
             context_builder = _get_ai_context_builder()
             if context_builder:
                 try:
-                    context = context_builder.build_context(user_id, client_id)
+                    context = web_server._run_blocking(context_builder.build_context, user_id, client_id)
                     
                     # If no destinations exist, add source folder as the only destination
                     if not context.get('known_destinations'):
@@ -701,7 +821,8 @@ def register_file_organizer_routes(app, web_server):
                     logger.warning(f"Could not build AI context: {e}")
             
             # Use shared batch analysis method (SINGLE SOURCE OF TRUTH)
-            batch_result = web_server._batch_analyze_files(
+            batch_result = web_server._run_blocking(
+                web_server._batch_analyze_files,
                 file_paths, 
                 use_ai=True, 
                 existing_folders=existing_folders,
@@ -722,7 +843,7 @@ def register_file_organizer_routes(app, web_server):
                 if 'error_details' in batch_result:
                     error_response['error_details'] = batch_result['error_details']
                 
-                return jsonify(error_response), 503
+                return json_response(error_response, 503)
             
             # Create analysis ID for this session
             import uuid
@@ -843,70 +964,30 @@ def register_file_organizer_routes(app, web_server):
             
             # If ALL files failed, return error
             if not operations and errors:
-                return jsonify({
+                return json_response({
                     'success': False, 
                     'error': 'All files failed to analyze',
                     'details': errors
-                }), 503
+                }, 503)
 
             # Create a persistent analysis session directly in the database
-            import json
-            from datetime import datetime
-            
-            now = datetime.now().isoformat()
-            
-            # Connect to the database using shared method
-            conn = web_server._get_file_organizer_db_connection()
-            
             try:
-                # Insert analysis session
-                conn.execute("""
-                    INSERT INTO analysis_sessions 
-                    (analysis_id, user_id, source_path, destination_path, organization_style, 
-                     file_count, created_at, updated_at, status, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
+                web_server._run_blocking(
+                    _save_analysis_session,
                     analysis_id,
                     user_id,
                     source_folder,
                     destination_folder,
                     organization_style,
-                    len(operations),
-                    now,
-                    now,
-                    'pending',
-                    json.dumps({
+                    {
                         'total_files': len(files),
                         'successful_operations': len(operations),
                         'failed_files': len(errors),
                         'file_plans_count': len(file_plans),
                         'fallback_plans_count': fallback_count
-                    })
-                ))
-                
-                # Insert operations
-                for idx, op in enumerate(operations):
-                    operation_id = f"{analysis_id}_op_{idx}"
-                    conn.execute("""
-                        INSERT INTO analysis_operations
-                        (operation_id, analysis_id, operation_type, source_path, destination_path,
-                         file_name, operation_status, metadata)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        operation_id,
-                        analysis_id,
-                        op['type'],
-                        op['source'],
-                        op['destination'],
-                        Path(op['source']).name,
-                        'pending',
-                        json.dumps({})
-                    ))
-                    # Add operation_id to response
-                    op['operation_id'] = operation_id
-                    op['status'] = 'pending'
-                
-                conn.commit()
+                    },
+                    operations
+                )
                 
                 # Extract unique destination folders and suggest colors
                 suggested_destinations = {}
@@ -914,7 +995,7 @@ def register_file_organizer_routes(app, web_server):
                 
                 if dest_manager:
                     # Get existing colors to avoid duplicates
-                    existing_destinations = dest_manager.get_destinations(user_id)
+                    existing_destinations = web_server._run_blocking(dest_manager.get_destinations, user_id)
                     existing_colors = [d.color for d in existing_destinations if d.color]
                     
                     # Extract unique destination folders from operations
@@ -973,18 +1054,15 @@ def register_file_organizer_routes(app, web_server):
                 if errors:
                     response['errors'] = errors
                 
-                return jsonify(response)
+                return json_response(response)
                 
             except Exception as db_error:
-                conn.rollback()
                 logger.error(f"Database error: {db_error}", exc_info=True)
-                return jsonify({'success': False, 'error': f'Database error: {str(db_error)}'}), 500
-            finally:
-                conn.close()
+                return json_response({'success': False, 'error': f'Database error: {str(db_error)}'}, 500)
                 
         except Exception as e:
             logger.error(f"/organize error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
 
     @app.route('/api/file-organizer/execute', methods=['POST'])
     def fo_execute_ops():
@@ -996,13 +1074,13 @@ def register_file_organizer_routes(app, web_server):
         2. New: file_plans array with multi-step execution
         """
         try:
-            data = request.get_json(force=True, silent=True) or {}
+            data = request_json()
             analysis_id = data.get('analysis_id')
             operation_ids = data.get('operation_ids', [])
             file_plans = data.get('file_plans', [])
             
             if not analysis_id:
-                return jsonify({'success': False, 'error': 'analysis_id required'}), 400
+                return json_response({'success': False, 'error': 'analysis_id required'}, 400)
             
             # Determine execution mode
             use_file_plans = len(file_plans) > 0
@@ -1016,7 +1094,7 @@ def register_file_organizer_routes(app, web_server):
                 
         except Exception as e:
             logger.error(f"/execute error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
 
     @app.route('/api/file-organizer/add-granularity', methods=['POST'])
     def fo_add_granularity():
@@ -1029,15 +1107,13 @@ def register_file_organizer_routes(app, web_server):
         2. Proposed folder: Uses file_paths array for not-yet-moved files
         """
         try:
-            data = request.get_json(force=True, silent=True) or {}
+            data = request_json()
             folder_path = data.get('folder_path')
             file_paths = data.get('file_paths')  # Optional: for proposed folders
             analysis_id = data.get('analysis_id')  # Optional: to track this as part of an analysis session
             
             if not folder_path:
-                return jsonify({'success': False, 'error': 'folder_path is required'}), 400
-            
-            import os
+                return json_response({'success': False, 'error': 'folder_path is required'}, 400)
             
             folder = Path(folder_path)
             items = []
@@ -1059,35 +1135,35 @@ def register_file_organizer_routes(app, web_server):
             # MODE 2: Existing folder (read files from disk)
             else:
                 if not folder.exists() or not folder.is_dir():
-                    return jsonify({'success': False, 'error': f'Folder does not exist: {folder_path}'}), 404
+                    return json_response({'success': False, 'error': f'Folder does not exist: {folder_path}'}, 404)
                 
                 logger.info(f"Add granularity in EXISTING mode: analyzing folder {folder_path}")
                 # Get all items (files and subfolders) in this folder
-                for item in folder.iterdir():
-                    items.append({
-                        'path': str(item),
-                        'name': item.name,
-                        'is_file': item.is_file(),
-                        'is_dir': item.is_dir(),
-                        'extension': item.suffix.lower() if item.is_file() else None
-                    })
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        is_file = entry.is_file()
+                        items.append({
+                            'path': entry.path,
+                            'name': entry.name,
+                            'is_file': is_file,
+                            'is_dir': entry.is_dir(),
+                            'extension': Path(entry.name).suffix.lower() if is_file else None
+                        })
             
             if not items:
-                return jsonify({
+                return json_response({
                     'success': True,
                     'operations': [],
                     'message': 'No files to analyze'
                 })
             
             # Call AI to add granularity
-            from file_organizer.ai_content_analyzer import AIContentAnalyzer
-            shared_services = web_server.components.get('shared_services')
-            analyzer = AIContentAnalyzer(shared_services=shared_services)
+            analyzer = web_server._get_ai_content_analyzer()
             
-            result = analyzer.add_granularity(folder_path, items)
+            result = web_server._run_blocking(analyzer.add_granularity, folder_path, items)
             
             if not result.get('success'):
-                return jsonify(result), 503
+                return json_response(result, 503)
             
             # Convert AI suggestions into FileOperation format
             operations = []
@@ -1109,7 +1185,7 @@ def register_file_organizer_routes(app, web_server):
                     # reason will be generated on-demand
                 })
             
-            return jsonify({
+            return json_response({
                 'success': True,
                 'operations': operations,
                 'folder': folder_path,
@@ -1119,7 +1195,7 @@ def register_file_organizer_routes(app, web_server):
             
         except Exception as e:
             logger.error(f"/add-granularity error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
     
     @app.route('/api/file-organizer/estimate-tokens', methods=['POST'])
     def fo_estimate_tokens():
@@ -1154,10 +1230,9 @@ def register_file_organizer_routes(app, web_server):
         """
         try:
             from file_organizer.token_counter import TokenCounter
-            from file_organizer.ai_content_analyzer import AIContentAnalyzer
             from file_organizer.request_models import OrganizeRequest
             
-            data = request.get_json()
+            data = request_json()
             
             # Parse request (same as /organize)
             try:
@@ -1186,15 +1261,15 @@ def register_file_organizer_routes(app, web_server):
                 files_metadata = {}
             
             if not source_folder or not destination_folder:
-                return jsonify({'success': False, 'error': 'source_path and destination_path required'}), 400
+                return json_response({'success': False, 'error': 'source_path and destination_path required'}, 400)
             
             # Get file paths
             src_path = Path(source_folder).expanduser()
             if provided_file_paths:
                 file_paths = provided_file_paths
             else:
-                files = [p for p in src_path.iterdir() if p.is_file()]
-                file_paths = [str(f) for f in files]
+                with os.scandir(src_path) as entries:
+                    file_paths = [entry.path for entry in entries if entry.is_file()]
             
             # Build AI context (same as /organize)
             ai_context_text = None
@@ -1208,7 +1283,7 @@ def register_file_organizer_routes(app, web_server):
             
             # Build the ACTUAL prompt that would be sent to AI
             shared_services = web_server.components.get('shared_services')
-            analyzer = AIContentAnalyzer(shared_services=shared_services)
+            analyzer = web_server._get_ai_content_analyzer()
             
             # Call internal method to build prompt (without sending to AI)
             prompt_data = analyzer._build_prompt_for_batch(
@@ -1235,7 +1310,7 @@ def register_file_organizer_routes(app, web_server):
                 estimated_output
             )
             
-            return jsonify({
+            return json_response({
                 'success': True,
                 'input_tokens': input_count['tokens'],
                 'estimated_output_tokens': estimated_output,
@@ -1251,6 +1326,6 @@ def register_file_organizer_routes(app, web_server):
             
         except Exception as e:
             logger.error(f"/estimate-tokens error: {e}", exc_info=True)
-            return jsonify({'success': False, 'error': str(e)}), 500
+            return json_response({'success': False, 'error': str(e)}, 500)
 
 # REMOVE OLD DUPLICATE CODE BELOW THIS LINE - IT SHOULD NOT EXIST
@@ -5,13 +5,43 @@ Handles HTTP API and WebSocket connections independently
 """
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 from datetime import datetime
 
+from core.db_pool import ConnectionPool
+from core.json_codec import SocketIOJSON
+from file_organizer.ai_content_analyzer import AIContentAnalyzer
+
+try:
+    from flask_compress import Compress
+except ImportError:  # flask-compress is optional
+    Compress = None
+
+try:
+    import gevent
+except ImportError:  # only present when serving with async_mode='gevent'
+    gevent = None
+
 logger = logging.getLogger('WebServer')
 
+_FILE_ORGANIZER_DB_PRAGMAS = """
+PRAGMA synchronous=NORMAL;
+PRAGMA busy_timeout=5000;
+PRAGMA cache_size=-20000;
+PRAGMA temp_store=MEMORY;
+"""
+
+# Prepared statements kept per connection; pooled connections live for the whole process
+_FILE_ORGANIZER_DB_CACHED_STATEMENTS = 256
+
+# Files per AI call when a batch analysis is fanned out across workers
+AI_BATCH_CHUNK_SIZE = 8
+MAX_BATCH_WORKERS = 16
+
 
 class WebServer:
     """
@@ -44,17 +74,91 @@ class WebServer:
         self._server_thread = None
         self._shutdown_flag = False
         
+        self._file_organizer_db_wal_enabled = False
+        # Pooled file organizer DB connections for request handlers (opened on first use)
+        self._fo_pool = ConnectionPool(lambda: self._get_file_organizer_db_connection(check_same_thread=False))
+        self._ai_content_analyzer = None
+        self._ai_content_analyzer_lock = threading.Lock()
+        
+        # File organizer sub-managers resolved by _get_file_organizer_manager; dropped when
+        # the module is started/stopped so a restarted module's managers are picked up
+        self._file_organizer_managers = {}
+        event_bus = components.get('event_bus')
+        if event_bus:
+            event_bus.subscribe('module_started', self._invalidate_file_organizer_managers, 'WebServer')
+            event_bus.subscribe('module_stopped', self._invalidate_file_organizer_managers, 'WebServer')
+        
         logger.info(f"🌐 Web Server initialized for {self.host}:{self.port}")
     
-    def _get_file_organizer_db_connection(self):
+    def _get_file_organizer_db_connection(self, check_same_thread=True):
         """
         SINGLE SOURCE OF TRUTH for file organizer database connection.
+        Pass check_same_thread=False for connections shared between threads (see _fo_pool).
         Returns: sqlite3.Connection object
         """
         import sqlite3
         import os
         db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "modules", "homie_file_organizer.db")
-        return sqlite3.connect(db_path)
+        conn = sqlite3.connect(
+            db_path, check_same_thread=check_same_thread, cached_statements=_FILE_ORGANIZER_DB_CACHED_STATEMENTS
+        )
+        # WAL is stored in the database file, so switching once per process is enough
+        if not self._file_organizer_db_wal_enabled:
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._file_organizer_db_wal_enabled = True
+        # Per-connection tuning: no fsync per commit (still crash-safe under WAL), wait on
+        # locks instead of failing with SQLITE_BUSY, ~20 MB page cache, in-memory temp tables
+        conn.executescript(_FILE_ORGANIZER_DB_PRAGMAS)
+        return conn
+    
+    def _get_ai_content_analyzer(self):
+        """
+        SINGLE SOURCE OF TRUTH for the AIContentAnalyzer instance.
+        Created on first use and shared by all routes (the analyzer keeps no per-request state).
+        """
+        analyzer = self._ai_content_analyzer
+        if analyzer is None:
+            with self._ai_content_analyzer_lock:
+                analyzer = self._ai_content_analyzer
+                if analyzer is None:
+                    analyzer = AIContentAnalyzer(shared_services=self.components.get('shared_services'))
+                    self._ai_content_analyzer = analyzer
+        return analyzer
+    
+    def _get_file_organizer_manager(self, attr_name):
+        """
+        SINGLE SOURCE OF TRUTH for file organizer sub-managers used by routes.
+        
+        Args:
+            attr_name: PathMemoryManager attribute, e.g. '_destination_manager' or '_drive_manager'
+        
+        Returns: the manager, or None if the module/manager isn't available yet (not cached)
+        """
+        manager = self._file_organizer_managers.get(attr_name)
+        if manager is None and self.app_manager:
+            file_organizer_app = self.app_manager.get_module('file_organizer')
+            path_mgr = getattr(file_organizer_app, 'path_memory_manager', None)
+            manager = getattr(path_mgr, attr_name, None)
+            if manager is not None:
+                self._file_organizer_managers[attr_name] = manager
+        return manager
+    
+    def _invalidate_file_organizer_managers(self, data=None):
+        """Forget resolved file organizer managers (file_organizer module started/stopped)"""
+        if data is None or data.get('module') == 'file_organizer':
+            self._file_organizer_managers.clear()
+    
+    def _run_blocking(self, fn, *args, **kwargs):
+        """
+        SINGLE SOURCE OF TRUTH for running blocking I/O (SQLite, manager calls) from a route.
+        
+        The gevent server isn't monkey patched, so a blocking call inside a request greenlet
+        stalls every other in-flight request. Under gevent the call is handed to the hub's
+        native threadpool and only this greenlet waits; otherwise it runs inline.
+        """
+        if gevent is not None and isinstance(gevent.getcurrent(), gevent.Greenlet):
+            return gevent.get_hub().threadpool.apply(fn, args, kwargs)
+        return fn(*args, **kwargs)
     
     def _call_ai_with_recovery(self, prompt):
         """
@@ -131,7 +235,7 @@ class WebServer:
                     'error': f'AI call failed after recovery: {str(retry_error)}'
                 }
     
-    def _batch_analyze_files(self, file_paths, use_ai=True, existing_folders=None, ai_context=None, files_metadata=None, source_path=None, granularity=1, user_id="dev_user"):
+    def _batch_analyze_files(self, file_paths, use_ai=True, existing_folders=None, ai_context=None, files_metadata=None, source_path=None, granularity=1, user_id="dev_user", workers=1):
         """
         SINGLE SOURCE OF TRUTH for batch file analysis.
         Both /organize and /analyze-content-batch call this method.
@@ -145,25 +249,57 @@ class WebServer:
             source_path: Optional source folder path (for relative path optimization)
             granularity: Organization granularity level (1=broad, 2=balanced, 3=detailed)
             user_id: User ID for loading user-specific settings
+            workers: Concurrent workers (1 = one AI call for all files; >1 splits AI batches
+                     into AI_BATCH_CHUNK_SIZE chunks and analyzes non-AI files in parallel)
         
         Returns: dict with 'success', 'results', 'ai_enabled', 'error' (if failed)
         """
-        from file_organizer.ai_content_analyzer import AIContentAnalyzer
-        
-        shared_services = self.components.get('shared_services')
-        analyzer = AIContentAnalyzer(shared_services=shared_services)
+        analyzer = self._get_ai_content_analyzer()
+        workers = max(1, min(int(workers), MAX_BATCH_WORKERS))
         
         if use_ai:
-            # Use batch analysis for AI (ONE call for all files!)
-            batch_result = analyzer.analyze_files_batch(
-                file_paths, 
-                existing_folders=existing_folders,
-                ai_context=ai_context,
-                files_metadata=files_metadata,
-                source_path=source_path,
-                granularity=granularity,
-                user_id=user_id  # Pass user_id for settings integration
-            )
+            def analyze_chunk(chunk):
+                return analyzer.analyze_files_batch(
+                    chunk, 
+                    existing_folders=existing_folders,
+                    ai_context=ai_context,
+                    files_metadata=files_metadata,
+                    source_path=source_path,
+                    granularity=granularity,
+                    user_id=user_id  # Pass user_id for settings integration
+                )
+            
+            chunk_errors = {}
+            if workers > 1 and len(file_paths) > AI_BATCH_CHUNK_SIZE:
+                # Overlap several smaller AI calls instead of one large one
+                chunk_size = AI_BATCH_CHUNK_SIZE
+                chunks = [file_paths[i:i + chunk_size] for i in range(0, len(file_paths), chunk_size)]
+                with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+                    chunk_results = list(executor.map(analyze_chunk, chunks))
+                
+                succeeded = [result for result in chunk_results if result.get('success')]
+                if succeeded:
+                    # Files of failed chunks carry their chunk's error (quota, auth, ...) below
+                    batch_result = {'success': True, 'results': {}}
+                    for result in succeeded:
+                        batch_result['results'].update(result.get('results', {}))
+                    for chunk, result in zip(chunks, chunk_results):
+                        if result.get('success'):
+                            continue
+                        chunk_error = {
+                            'success': False,
+                            'error': result.get('error') or 'No result from batch analysis',
+                            'content_type': 'unknown'
+                        }
+                        if 'error_details' in result:
+                            chunk_error['error_details'] = result['error_details']
+                        for file_path in chunk:
+                            chunk_errors[file_path] = chunk_error
+                else:
+                    batch_result = chunk_results[0]
+            else:
+                # Use batch analysis for AI (ONE call for all files!)
+                batch_result = analyze_chunk(file_paths)
             
             if not batch_result.get('success'):
                 logger.warning(f"Batch AI analysis failed: {batch_result.get('error')}")
@@ -184,6 +320,8 @@ class WebServer:
             for file_path in file_paths:
                 if file_path in results:
                     results[file_path]['success'] = True
+                elif file_path in chunk_errors:
+                    results[file_path] = dict(chunk_errors[file_path])
                 else:
                     results[file_path] = {
                         'success': False,
@@ -198,21 +336,26 @@ class WebServer:
             }
         
         # Non-AI path: analyze files individually
-        results = {}
-        for file_path in file_paths:
+        def analyze_single(file_path):
             try:
                 result = analyzer.analyze_file(file_path, use_ai=False)
                 if not result.get('success'):
                     result['content_type'] = 'unknown'
-                results[file_path] = result
+                return result
             except Exception as e:
                 logger.warning(f"Error analyzing {file_path}: {e}")
-                results[file_path] = {
+                return {
                     'success': False,
                     'error': str(e),
                     'content_type': 'unknown'
                 }
         
+        if workers > 1 and len(file_paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(file_paths))) as executor:
+                results = dict(zip(file_paths, executor.map(analyze_single, file_paths)))
+        else:
+            results = {file_path: analyze_single(file_path) for file_path in file_paths}
+        
         return {
             'success': True,
             'ai_enabled': False,
@@ -227,8 +370,15 @@ class WebServer:
             self.app.config['SECRET_KEY'] = 'homie-dev-secret-key'
             CORS(self.app)
             
-            # Initialize SocketIO (use gevent for clean shutdown)
-            self.socketio = SocketIO(self.app, cors_allowed_origins="*", async_mode='gevent')
+            # gzip larger JSON responses (e.g. batch analysis results) when flask-compress is installed;
+            # streamed responses (SSE, incremental JSON) are left alone so they aren't buffered
+            if Compress:
+                self.app.config['COMPRESS_MIN_SIZE'] = 1024
+                self.app.config['COMPRESS_STREAMS'] = False
+                Compress(self.app)
+            
+            # Initialize SocketIO (use gevent for clean shutdown, orjson-backed packet encoding)
+            self.socketio = SocketIO(self.app, cors_allowed_origins="*", async_mode='gevent', json=SocketIOJSON)
             
             # Connect SocketIO to event bus
             if 'event_bus' in self.components:
@@ -547,4 +697,5 @@ class WebServer:
     async def shutdown(self):
         """Shutdown web server"""
         logger.info("🛑 Web Server shutdown (gevent handles this automatically)")
+        self._fo_pool.close()
         # With gevent, the server will stop when the process receives SIGINT/SIGTERM
@@ -36,6 +36,10 @@ ai_handler = RotatingFileHandler(
 ai_handler.setFormatter(logging.Formatter('%(message)s'))
 ai_logger.addHandler(ai_handler)
 
+# Duplicate scan: same-size files are compared on their first block before full hashing
+DUPLICATE_HEAD_BYTES = 64 * 1024
+HASH_READ_CHUNK_BYTES = 1024 * 1024
+
 
 class AIContentAnalyzer:
     """
@@ -1443,28 +1447,36 @@ Be creative and intelligent with your folder suggestions. Use the filename and c
             Dictionary with duplicate groups
         """
         try:
-            # Step 1: Group files by size (performance optimization)
+            # Step 1: Group files by size (performance optimization, one stat per file)
             files_by_size = {}
             for file_path in file_paths:
-                if not os.path.exists(file_path):
+                try:
+                    size = os.stat(file_path).st_size
+                except OSError:
                     continue
-                
-                size = os.path.getsize(file_path)
-                if size not in files_by_size:
-                    files_by_size[size] = []
-                files_by_size[size].append(file_path)
+                files_by_size.setdefault(size, []).append(file_path)
             
-            # Step 2: Calculate hashes only for files with same size
+            # Step 2: Calculate hashes only for files with same size; for files larger than
+            # the head block, hash the head first and fully hash only matching heads
             hash_to_files = {}
+            size_by_hash = {}
             for size, files in files_by_size.items():
                 if len(files) < 2:
                     continue  # Skip files with unique size
                 
-                for file_path in files:
-                    file_hash = self._calculate_file_hash(file_path)
-                    if file_hash not in hash_to_files:
-                        hash_to_files[file_hash] = []
-                    hash_to_files[file_hash].append(file_path)
+                if size > DUPLICATE_HEAD_BYTES:
+                    files_by_head = {}
+                    for file_path in files:
+                        files_by_head.setdefault(self._calculate_file_hash(file_path, DUPLICATE_HEAD_BYTES), []).append(file_path)
+                    candidates = [group for group in files_by_head.values() if len(group) > 1]
+                else:
+                    candidates = [files]
+                
+                for group in candidates:
+                    for file_path in group:
+                        file_hash = self._calculate_file_hash(file_path)
+                        hash_to_files.setdefault(file_hash, []).append(file_path)
+                        size_by_hash[file_hash] = size
             
             # Step 3: Build duplicate groups
             duplicate_groups = []
@@ -1475,7 +1487,7 @@ Be creative and intelligent with your folder suggestions. Use the filename and c
                 if len(files) < 2:
                     continue  # Not a duplicate
                 
-                file_size = os.path.getsize(files[0])
+                file_size = size_by_hash[file_hash]
                 wasted_space = file_size * (len(files) - 1)
                 total_wasted_space += wasted_space
                 total_duplicate_files += len(files) - 1
@@ -1653,13 +1665,19 @@ Be creative and intelligent with your folder suggestions. Use the filename and c
 
         return {"success": True, "alternatives": alternatives}
         
-    def _calculate_file_hash(self, file_path: str) -> str:
-        """Calculate SHA256 hash of a file"""
+    def _calculate_file_hash(self, file_path: str, limit: Optional[int] = None) -> str:
+        """Calculate SHA256 hash of a file (or of its first `limit` bytes)"""
         sha256_hash = hashlib.sha256()
+        remaining = limit
         with open(file_path, 'rb') as f:
             # Read file in chunks to handle large files
-            for byte_block in iter(lambda: f.read(4096), b''):
+            while remaining is None or remaining > 0:
+                byte_block = f.read(HASH_READ_CHUNK_BYTES if remaining is None else min(HASH_READ_CHUNK_BYTES, remaining))
+                if not byte_block:
+                    break
                 sha256_hash.update(byte_block)
+                if remaining is not None:
+                    remaining -= len(byte_block)
         return sha256_hash.hexdigest()
     
     def _get_file_info_for_duplicate(self, file_path: str) -> Dict[str, Any]:
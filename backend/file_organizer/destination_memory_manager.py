@@ -14,15 +14,22 @@ Responsibilities:
 
 import logging
 import sqlite3
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 from .models import Destination, DestinationUsage
 
 logger = logging.getLogger("DestinationMemoryManager")
 
+# get_destinations_by_category cache bounds (entries are also dropped on writes)
+CATEGORY_CACHE_MAX_ENTRIES = 256
+CATEGORY_CACHE_TTL_SECONDS = 60.0
+
 
 class DestinationMemoryManager:
     """Manages destination learning and retrieval for file organization."""
@@ -35,6 +42,9 @@ class DestinationMemoryManager:
             db_path: Path to the SQLite database file
         """
         self.db_path = db_path
+        self._category_cache: "OrderedDict[Tuple[str, str], Tuple[float, List[Destination]]]" = OrderedDict()
+        self._category_cache_lock = threading.Lock()
+        self._category_cache_generation = 0
 
     def _get_db_connection(self) -> sqlite3.Connection:
         """
@@ -47,6 +57,21 @@ class DestinationMemoryManager:
         conn.row_factory = sqlite3.Row
         return conn
 
+    def _invalidate_category_cache(self, user_id: Optional[str] = None):
+        """
+        Drop cached category lookups.
+        
+        Args:
+            user_id: Only drop this user's entries (all entries if None)
+        """
+        with self._category_cache_lock:
+            self._category_cache_generation += 1
+            if user_id is None:
+                self._category_cache.clear()
+                return
+            for key in [key for key in self._category_cache if key[0] == user_id]:
+                del self._category_cache[key]
+
     def get_destinations(self, user_id: str) -> List[Destination]:
         """
         Retrieve all active destinations for a user.
@@ -171,6 +196,7 @@ class DestinationMemoryManager:
                             """, (datetime.now().isoformat(), existing['id']))
                         
                         conn.commit()
+                        self._invalidate_category_cache(user_id)
                         
                         # Fetch the updated destination
                         cursor = conn.execute("""
@@ -207,6 +233,7 @@ class DestinationMemoryManager:
                 """, (destination_id, user_id, normalized_path, category, color, drive_id, now, None))
                 
                 conn.commit()
+                self._invalidate_category_cache(user_id)
                 
                 # Retrieve and return the created destination
                 cursor = conn.execute("""
@@ -276,6 +303,7 @@ class DestinationMemoryManager:
                 cascaded_count = cascade_cursor.rowcount
                 
                 conn.commit()
+                self._invalidate_category_cache(user_id)
                 
                 if cascaded_count > 0:
                     logger.info(f"Removed destination {destination_id} and cascaded to {cascaded_count} child destination(s)")
@@ -362,6 +390,7 @@ class DestinationMemoryManager:
                 
                 conn.execute(update_query, update_values)
                 conn.commit()
+                self._invalidate_category_cache(user_id)
                 
                 # Retrieve and return updated destination
                 cursor = conn.execute("""
@@ -435,9 +464,20 @@ class DestinationMemoryManager:
             user_id: User identifier
             category: File category (case-insensitive)
             
+        Results are cached per (user, category) for CATEGORY_CACHE_TTL_SECONDS
+        and dropped whenever this manager writes the user's destinations.
+        
         Returns:
             List of Destination objects ordered by usage
         """
+        cache_key = (user_id, category.lower())
+        with self._category_cache_lock:
+            cached = self._category_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < CATEGORY_CACHE_TTL_SECONDS:
+                self._category_cache.move_to_end(cache_key)
+                return list(cached[1])
+            generation = self._category_cache_generation
+        
         try:
             with self._get_db_connection() as conn:
                 cursor = conn.execute("""
@@ -454,7 +494,15 @@ class DestinationMemoryManager:
                     destinations.append(Destination.from_db_row(row))
                 
                 logger.debug(f"Retrieved {len(destinations)} destinations for category '{category}'")
-                return destinations
+                
+                with self._category_cache_lock:
+                    # Skip caching if a write landed while we were querying
+                    if generation == self._category_cache_generation:
+                        self._category_cache[cache_key] = (time.monotonic(), destinations)
+                        self._category_cache.move_to_end(cache_key)
+                        if len(self._category_cache) > CATEGORY_CACHE_MAX_ENTRIES:
+                            self._category_cache.popitem(last=False)
+                return list(destinations)
                 
         except Exception as e:
             logger.error(f"Error retrieving destinations for category {category}: {e}")
@@ -479,7 +527,7 @@ class DestinationMemoryManager:
         """
         try:
             newly_captured = []
-            unique_paths = set()
+            unique_paths = {}  # insertion-ordered set
             
             # Extract unique destination paths
             for op in operations:
@@ -488,15 +536,22 @@ class DestinationMemoryManager:
                     # Get the parent directory (the destination folder)
                     try:
                         folder_path = str(Path(dest_path).parent.resolve())
-                        unique_paths.add(folder_path)
+                        unique_paths[folder_path] = None
                     except Exception as e:
                         logger.warning(f"Could not extract folder from path {dest_path}: {e}")
             
-            # Process each unique destination path
-            for path in unique_paths:
-                try:
-                    # Check if destination already exists
-                    with self._get_db_connection() as conn:
+            if not unique_paths:
+                return []
+            
+            # Insert every new destination in one write transaction (a single commit/fsync)
+            with self._get_db_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                existing_colors = self._get_existing_colors(user_id, conn)
+                from .color_palette import assign_color_from_palette
+                
+                for path in unique_paths:
+                    try:
+                        # Check if destination already exists
                         cursor = conn.execute("""
                             SELECT id FROM destinations
                             WHERE user_id = ? AND path = ?
@@ -505,22 +560,44 @@ class DestinationMemoryManager:
                         if cursor.fetchone():
                             logger.debug(f"Destination already exists: {path}")
                             continue
-                    
-                    # Extract category from path
-                    category = self.extract_category_from_path(path)
-                    
-                    # Determine drive_id using client-specific mount points
-                    drive_id = self.get_drive_for_path(user_id, client_id, path)
-                    
-                    # Add the destination
-                    destination = self.add_destination(user_id, path, category, client_id, drive_id)
-                    if destination:
+                        
+                        # Extract category from path
+                        category = self.extract_category_from_path(path)
+                        
+                        # Determine drive_id using client-specific mount points
+                        drive_id = self.get_drive_for_path(user_id, client_id, path)
+                        
+                        # Colors assigned earlier in this batch count as taken
+                        color = assign_color_from_palette(existing_colors)
+                        existing_colors.append(color)
+                        
+                        destination = Destination(
+                            id=str(uuid.uuid4()),
+                            user_id=user_id,
+                            path=path,
+                            category=category,
+                            color=color,
+                            drive_id=drive_id,
+                            created_at=datetime.now(),
+                            last_used_at=None,
+                            usage_count=0,
+                            is_active=True
+                        )
+                        conn.execute("""
+                            INSERT INTO destinations 
+                            (id, user_id, path, category, color, drive_id, created_at, last_used_at, usage_count, is_active)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, 1)
+                        """, (destination.id, user_id, path, category, color, drive_id,
+                              destination.created_at.isoformat(), None))
                         newly_captured.append(destination)
                         
-                except Exception as e:
-                    logger.error(f"Error capturing destination {path}: {e}")
+                    except Exception as e:
+                        logger.error(f"Error capturing destination {path}: {e}")
+                
+                conn.commit()
             
             if newly_captured:
+                self._invalidate_category_cache(user_id)
                 logger.info(f"Auto-captured {len(newly_captured)} new destinations")
             
             return newly_captured
@@ -648,6 +725,8 @@ class DestinationMemoryManager:
                 """, (usage_id, destination_id, now, file_count, operation_type))
                 
                 conn.commit()
+                # Usage changes the ordering; the owning user isn't known here
+                self._invalidate_category_cache()
                 
                 logger.debug(f"Updated usage for destination {destination_id}: {file_count} files")
                 return True
@@ -20,15 +20,22 @@ Responsibilities:
 
 import logging
 import sqlite3
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 from .models import Drive, DriveClientMount
 
 logger = logging.getLogger("DriveManager")
 
+# get_client_drives cache bounds (entries are also dropped when drives change)
+CLIENT_DRIVES_CACHE_MAX_ENTRIES = 128
+CLIENT_DRIVES_CACHE_TTL_SECONDS = 5.0
+
 
 class DriveManager:
     """Manages drive tracking across multiple frontend clients."""
@@ -41,6 +48,9 @@ class DriveManager:
             db_path: Path to the SQLite database file
         """
         self.db_path = db_path
+        self._client_drives_cache: "OrderedDict[Tuple[str, str], Tuple[float, List[Drive]]]" = OrderedDict()
+        self._client_drives_cache_lock = threading.Lock()
+        self._client_drives_cache_generation = 0
 
     def _get_db_connection(self) -> sqlite3.Connection:
         """
@@ -53,6 +63,21 @@ class DriveManager:
         conn.row_factory = sqlite3.Row
         return conn
 
+    def _invalidate_client_drives_cache(self, user_id: Optional[str] = None):
+        """
+        Drop cached client drive lookups.
+        
+        Args:
+            user_id: Only drop this user's entries (all entries if None)
+        """
+        with self._client_drives_cache_lock:
+            self._client_drives_cache_generation += 1
+            if user_id is None:
+                self._client_drives_cache.clear()
+                return
+            for key in [key for key in self._client_drives_cache if key[0] == user_id]:
+                del self._client_drives_cache[key]
+
     def get_drives(self, user_id: str) -> List[Drive]:
         """
         Retrieve all known drives for a user across ALL client devices.
@@ -100,6 +125,48 @@ class DriveManager:
             logger.error(f"Error retrieving drives for user {user_id}: {e}")
             return []
 
+    def get_drive_by_id(self, user_id: str, drive_id: str) -> Optional[Drive]:
+        """
+        Retrieve a single drive (with all its client mounts) by primary key.
+        
+        Args:
+            user_id: User identifier
+            drive_id: Drive UUID
+            
+        Returns:
+            Drive object if found for this user, None otherwise
+        """
+        try:
+            with self._get_db_connection() as conn:
+                cursor = conn.execute("""
+                    SELECT 
+                        id, user_id, unique_identifier, mount_point, volume_label,
+                        drive_type, cloud_provider, is_available, last_seen_at, created_at
+                    FROM drives
+                    WHERE id = ? AND user_id = ?
+                """, (drive_id, user_id))
+                
+                row = cursor.fetchone()
+                if not row:
+                    return None
+                
+                drive = Drive.from_db_row(row)
+                
+                # Load client mounts for this drive
+                mount_cursor = conn.execute("""
+                    SELECT id, drive_id, client_id, mount_point, last_seen_at, is_available
+                    FROM drive_client_mounts
+                    WHERE drive_id = ?
+                    ORDER BY last_seen_at DESC
+                """, (drive.id,))
+                
+                drive.client_mounts = [DriveClientMount.from_db_row(mount_row) for mount_row in mount_cursor.fetchall()]
+                return drive
+                
+        except Exception as e:
+            logger.error(f"Error retrieving drive {drive_id}: {e}")
+            return None
+
     def register_drive(
         self, 
         user_id: str, 
@@ -192,6 +259,7 @@ class DriveManager:
                 logger.info(f"Updated mount for drive {drive_id} on client {client_id}: {mount_point}")
                 
                 conn.commit()
+                self._invalidate_client_drives_cache(user_id)
                 
                 # Retrieve and return the drive
                 cursor = conn.execute("""
@@ -394,6 +462,7 @@ class DriveManager:
                 
                 # Commit all changes atomically
                 conn.commit()
+                self._invalidate_client_drives_cache(user_id)
                 
                 logger.info(f"Batch registered {len(registered_drives)} drives for user {user_id} from client {client_id}")
                 return registered_drives
@@ -464,6 +533,7 @@ class DriveManager:
                 """, (1 if drive_available else 0, now, drive.id))
                 
                 conn.commit()
+                self._invalidate_client_drives_cache(user_id)
                 
                 status = "available" if is_available else "unavailable"
                 logger.info(f"Drive {drive.id} ({unique_identifier}) marked {status} on client {client_id}")
@@ -645,9 +715,20 @@ class DriveManager:
             user_id: User identifier
             client_id: Client/laptop identifier
             
+        Results are cached per (user, client) for CLIENT_DRIVES_CACHE_TTL_SECONDS
+        and dropped whenever this manager registers drives or changes availability.
+        
         Returns:
             List of Drive objects available on this client
         """
+        cache_key = (user_id, client_id)
+        with self._client_drives_cache_lock:
+            cached = self._client_drives_cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < CLIENT_DRIVES_CACHE_TTL_SECONDS:
+                self._client_drives_cache.move_to_end(cache_key)
+                return list(cached[1])
+            generation = self._client_drives_cache_generation
+        
         try:
             with self._get_db_connection() as conn:
                 cursor = conn.execute("""
@@ -681,7 +762,15 @@ class DriveManager:
                     drives.append(drive)
                 
                 logger.debug(f"Retrieved {len(drives)} drives for client {client_id}")
-                return drives
+                
+                with self._client_drives_cache_lock:
+                    # Skip caching if drives changed while we were querying
+                    if generation == self._client_drives_cache_generation:
+                        self._client_drives_cache[cache_key] = (time.monotonic(), drives)
+                        self._client_drives_cache.move_to_end(cache_key)
+                        if len(self._client_drives_cache) > CLIENT_DRIVES_CACHE_MAX_ENTRIES:
+                            self._client_drives_cache.popitem(last=False)
+                return list(drives)
                 
         except Exception as e:
             logger.error(f"Error retrieving client drives: {e}")
@@ -174,6 +174,8 @@ class PathMemoryManager:
                 )
                 """
             )
+            # Covers GET /destinations fallback (id is the rowid, so it is part of every index)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_destination_mappings_user_category ON destination_mappings(user_id, file_category, destination_path)")
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS analysis_sessions (
@@ -228,6 +230,8 @@ class PathMemoryManager:
             )
             conn.execute("CREATE INDEX IF NOT EXISTS idx_file_org_history_user_id ON file_organization_history(user_id)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_file_org_history_content_type ON file_organization_history(content_type)")
+            # Refresh planner statistics (only ANALYZEs tables whose stats are missing/stale)
+            conn.execute("PRAGMA optimize")
         
     async def _on_operation_done(self, data: Dict[str, Any]):
         """Persist results from executed operations."""
@@ -161,6 +161,36 @@ def test_get_destinations_by_category():
         os.unlink(db_path)
 
 
+def test_get_destinations_by_category_cache():
+    """Test that cached category lookups are refreshed after writes"""
+    print("\n=== Test: get_destinations_by_category cache ===")
+    
+    db_path = setup_test_db()
+    manager = DestinationMemoryManager(db_path)
+    
+    try:
+        dest = manager.add_destination("test_user", "/home/user/Documents/Invoices", "invoice", "test_client")
+        assert len(manager.get_destinations_by_category("test_user", "invoice")) == 1
+        
+        # Served from cache, and callers can't corrupt the cached list
+        cached = manager.get_destinations_by_category("test_user", "INVOICE")
+        cached.clear()
+        assert len(manager.get_destinations_by_category("test_user", "invoice")) == 1
+        print("✅ Repeated lookups served from cache")
+        
+        manager.add_destination("test_user", "/home/user/Documents/Invoices/2024", "invoice", "test_client")
+        assert len(manager.get_destinations_by_category("test_user", "invoice")) == 2
+        
+        manager.remove_destination("test_user", dest.id)
+        assert len(manager.get_destinations_by_category("test_user", "invoice")) == 0
+        print("✅ Cache invalidated on add/remove")
+        
+        print("✅ test_get_destinations_by_category_cache passed")
+        
+    finally:
+        os.unlink(db_path)
+
+
 def test_extract_category_from_path():
     """Test category extraction from paths"""
     print("\n=== Test: extract_category_from_path ===")
@@ -208,6 +238,7 @@ def test_auto_capture_destinations():
         captured = manager.auto_capture_destinations("test_user", operations, "test_client")
         
         assert len(captured) == 2, f"Expected 2 unique destinations, got {len(captured)}"
+        assert len({dest.color for dest in captured}) == 2, "Each captured destination should get its own color"
         print(f"✅ Captured {len(captured)} destinations")
         
         for dest in captured:
@@ -376,6 +407,7 @@ def run_all_tests():
         test_get_destinations,
         test_remove_destination,
         test_get_destinations_by_category,
+        test_get_destinations_by_category_cache,
         test_extract_category_from_path,
         test_auto_capture_destinations,
         test_update_usage,
@@ -354,6 +354,74 @@ def test_get_client_drives():
         os.unlink(db_path)
 
 
+def test_get_drive_by_id():
+    """Test looking up a single drive by id"""
+    print("\n=== Test: get_drive_by_id ===")
+    
+    db_path = setup_test_db()
+    manager = DriveManager(db_path)
+    
+    try:
+        drive_info = {
+            'unique_identifier': 'USB-BY-ID',
+            'mount_point': '/media/usb',
+            'volume_label': 'USB Drive',
+            'drive_type': 'usb'
+        }
+        registered = manager.register_drive("test_user", drive_info, "laptop1")
+        
+        drive = manager.get_drive_by_id("test_user", registered.id)
+        assert drive is not None
+        assert drive.unique_identifier == 'USB-BY-ID'
+        assert [mount.client_id for mount in drive.client_mounts] == ["laptop1"]
+        print(f"✅ Found drive {drive.id}")
+        
+        assert manager.get_drive_by_id("other_user", registered.id) is None
+        assert manager.get_drive_by_id("test_user", "missing") is None
+        print("✅ Other users' and unknown drives are not returned")
+        
+        print("✅ test_get_drive_by_id passed")
+        
+    finally:
+        os.unlink(db_path)
+
+
+def test_get_client_drives_cache():
+    """Test that client drive lookups are cached and dropped on drive changes"""
+    print("\n=== Test: get_client_drives_cache ===")
+    
+    db_path = setup_test_db()
+    manager = DriveManager(db_path)
+    
+    try:
+        drive_info = {
+            'unique_identifier': 'USB-CACHE-1',
+            'mount_point': '/media/usb',
+            'volume_label': 'USB Drive',
+            'drive_type': 'usb'
+        }
+        manager.register_drive("test_user", drive_info, "laptop1")
+        
+        first = manager.get_client_drives("test_user", "laptop1")
+        assert len(first) == 1
+        assert ("test_user", "laptop1") in manager._client_drives_cache
+        
+        # Callers get their own list
+        first.clear()
+        assert len(manager.get_client_drives("test_user", "laptop1")) == 1
+        print("✅ Cached lookup returned a fresh list")
+        
+        # Unplugging the drive invalidates the cached entry
+        assert manager.update_drive_availability("test_user", 'USB-CACHE-1', False, "laptop1")
+        assert manager.get_client_drives("test_user", "laptop1") == []
+        print("✅ Availability change invalidated the cache")
+        
+        print("✅ test_get_client_drives_cache passed")
+        
+    finally:
+        os.unlink(db_path)
+
+
 def run_all_tests():
     """Run all tests"""
     print("=" * 60)
@@ -368,6 +436,8 @@ def run_all_tests():
         test_get_drive_for_path,
         test_get_drives,
         test_get_client_drives,
+        test_get_drive_by_id,
+        test_get_client_drives_cache,
     ]
     
     passed = 0
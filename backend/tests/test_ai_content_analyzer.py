@@ -208,6 +208,38 @@ class TestGenericVideo:
         assert result['confidence_score'] == 0.6
 
 
+class TestDuplicateScan:
+    """Test content-hash duplicate detection"""
+    
+    def test_detects_duplicates_and_skips_different_heads(self, tmp_path):
+        from file_organizer import ai_content_analyzer
+        
+        head_size = ai_content_analyzer.DUPLICATE_HEAD_BYTES
+        big = b'a' * (head_size * 2)
+        same_size_other_head = b'b' + big[1:]
+        same_head_other_tail = big[:-1] + b'b'
+        
+        paths = []
+        for name, content in [
+            ('big.bin', big), ('big copy.bin', big),
+            ('other_head.bin', same_size_other_head), ('other_tail.bin', same_head_other_tail),
+            ('small.txt', b'hello'), ('small copy.txt', b'hello'), ('unique.txt', b'unique'),
+        ]:
+            file_path = tmp_path / name
+            file_path.write_bytes(content)
+            paths.append(str(file_path))
+        paths.append(str(tmp_path / 'missing.txt'))
+        
+        result = AIContentAnalyzer().scan_duplicates(paths)
+        
+        assert result['success'] is True
+        groups = sorted(
+            sorted(info['file_name'] for info in group['files'])
+            for group in result['duplicate_groups']
+        )
+        assert groups == [['big copy.bin', 'big.bin'], ['small copy.txt', 'small.txt']]
+        assert result['total_wasted_space'] == len(big) + len(b'hello')
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
-
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the AI routes
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+flask = pytest.importorskip('flask')
+
+from core.routes.ai_routes import register_ai_routes
+
+
+class FakeAnalyzer:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    def analyze_file(self, file_path, use_ai=True):
+        self.calls.append((file_path, use_ai))
+        return self.result
+
+
+class FakeWebServer:
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.blocking_calls = 0
+
+    def _get_ai_content_analyzer(self):
+        return self.analyzer
+
+    def _run_blocking(self, fn, *args, **kwargs):
+        self.blocking_calls += 1
+        return fn(*args, **kwargs)
+
+
+def make_client(result):
+    app = flask.Flask(__name__)
+    web_server = FakeWebServer(FakeAnalyzer(result))
+    register_ai_routes(app, web_server)
+    return app.test_client(), web_server
+
+
+class TestSuggestDestination:
+    """Test single-file destination suggestions"""
+
+    def test_content_type_is_preserved(self):
+        client, web_server = make_client({
+            'success': True, 'content_type': 'movie', 'suggested_folder': 'Movies'
+        })
+
+        response = client.post('/api/file-organizer/suggest-destination', json={'file_path': '/tmp/a.mkv'})
+
+        assert response.status_code == 200
+        assert response.get_json() == {'success': True, 'suggested_folder': 'Movies', 'content_type': 'movie'}
+        assert web_server.analyzer.calls == [('/tmp/a.mkv', True)]
+        assert web_server.blocking_calls == 1
+
+    def test_analysis_failure_returns_503(self):
+        client, _ = make_client({'success': False, 'error': 'AI unavailable'})
+
+        response = client.post('/api/file-organizer/suggest-destination', json={'file_path': '/tmp/a.mkv'})
+
+        assert response.status_code == 503
+        assert response.get_json()['error'] == 'AI unavailable'
+
+    def test_missing_file_path_is_rejected(self):
+        client, _ = make_client({'success': True})
+
+        response = client.post('/api/file-organizer/suggest-destination', json={})
+
+        assert response.status_code == 400
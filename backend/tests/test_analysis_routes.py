@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the analysis routes
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip('flask')
+
+from core.routes.analysis_routes import _path_key
+
+
+class TestPathKey:
+    """Test the duplicate-detection key for batch analysis paths"""
+
+    def test_equivalent_spellings_match(self, tmp_path):
+        (tmp_path / 'a').mkdir()
+        (tmp_path / 'a' / 'x').touch()
+
+        assert _path_key(f"{tmp_path}/a//x") == _path_key(f"{tmp_path}/a/./x") == _path_key(f"{tmp_path}/a/x")
+
+    @pytest.mark.skipif(not hasattr(os, 'symlink') or os.name == 'nt', reason='needs POSIX symlinks')
+    def test_dotdot_after_symlink_is_not_collapsed(self, tmp_path):
+        for folder in ('a', 'b'):
+            (tmp_path / folder).mkdir()
+            (tmp_path / folder / 'x').touch()
+        (tmp_path / 'a' / 'link').symlink_to(tmp_path / 'b' / 'sub', target_is_directory=True)
+        (tmp_path / 'b' / 'sub').mkdir()
+
+        assert _path_key(f"{tmp_path}/a/link/../x") == _path_key(f"{tmp_path}/b/x")
+        assert _path_key(f"{tmp_path}/a/link/../x") != _path_key(f"{tmp_path}/a/x")
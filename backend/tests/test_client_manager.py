@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Unit tests for ClientManager
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.event_bus import EventBus
+from core.client_manager import ClientManager, AppModule
+
+
+class TestModuleSessions:
+    """Test the module -> sockets index"""
+
+    def test_index_follows_connect_switch_disconnect(self):
+        manager = ClientManager(EventBus())
+
+        async def scenario():
+            await manager.handle_connect('sock1')
+            await manager.handle_connect('sock2')
+            assert manager.module_sessions[AppModule.MAIN_MENU] == {'sock1', 'sock2'}
+
+            await manager.switch_module('sock1', 'file_organizer')
+            assert manager.module_sessions[AppModule.MAIN_MENU] == {'sock2'}
+            assert manager.module_sessions[AppModule.FILE_ORGANIZER] == {'sock1'}
+
+            await manager.handle_disconnect('sock1')
+            assert manager.module_sessions[AppModule.FILE_ORGANIZER] == set()
+
+        asyncio.run(scenario())
+
+    def test_get_module_users_only_returns_authenticated_users(self):
+        manager = ClientManager(EventBus())
+
+        async def scenario():
+            await manager.handle_connect('sock1')
+            await manager.handle_connect('sock2')
+            await manager.authenticate_user('sock1', {'user_id': 'alice'})
+            await manager.switch_module('sock1', 'file_organizer')
+            await manager.switch_module('sock2', 'file_organizer')
+
+        asyncio.run(scenario())
+
+        assert manager.get_module_users(AppModule.FILE_ORGANIZER) == {'alice'}
+        assert manager.get_module_users(AppModule.MAIN_MENU) == set()
+
+
+class FakeSocketServer:
+    def __init__(self):
+        self.rooms = {}
+
+    def enter_room(self, sid, room, namespace=None):
+        self.rooms.setdefault(room, set()).add(sid)
+
+    def leave_room(self, sid, room, namespace=None):
+        self.rooms.get(room, set()).discard(sid)
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.server = FakeSocketServer()
+        self.emitted = []
+
+    def emit(self, event, data, room=None):
+        self.emitted.append((event, room))
+
+
+class TestRoomBroadcasts:
+    """Test that broadcasts go through SocketIO rooms"""
+
+    def test_sockets_join_user_and_module_rooms(self):
+        bus = EventBus()
+        socketio = FakeSocketIO()
+        bus.set_socketio(socketio)
+        manager = ClientManager(bus)
+
+        async def scenario():
+            await manager.handle_connect('sock1')
+            await manager.authenticate_user('sock1', {'user_id': 'alice'})
+            await manager.switch_module('sock1', 'file_organizer')
+
+        asyncio.run(scenario())
+
+        assert socketio.server.rooms['user:alice'] == {'sock1'}
+        assert socketio.server.rooms['module:main_menu'] == set()
+        assert socketio.server.rooms['module:file_organizer'] == {'sock1'}
+
+    def test_broadcasts_emit_once_per_room(self):
+        bus = EventBus()
+        socketio = FakeSocketIO()
+        bus.set_socketio(socketio)
+        manager = ClientManager(bus)
+
+        async def scenario():
+            for sid in ('sock1', 'sock2'):
+                await manager.handle_connect(sid)
+                await manager.authenticate_user(sid, {'user_id': 'alice'})
+            socketio.emitted.clear()
+            sent_to_user = await manager.broadcast_to_user('alice', 'ping', {})
+            sent_to_module = await manager.broadcast_to_module(AppModule.MAIN_MENU, 'ping', {})
+            return sent_to_user, sent_to_module
+
+        sent_to_user, sent_to_module = asyncio.run(scenario())
+
+        assert sent_to_user is True
+        assert sent_to_module == 2
+        assert socketio.emitted == [('ping', 'user:alice'), ('ping', 'module:main_menu')]
+
+
+class TestShutdown:
+    """Test client manager shutdown"""
+
+    def test_shutdown_disconnects_all_sessions_and_rejects_new_ones(self):
+        manager = ClientManager(EventBus())
+
+        async def scenario():
+            for index in range(5):
+                await manager.handle_connect(f'sock{index}')
+            await manager.shutdown()
+            return await manager.handle_connect('late')
+
+        late_result = asyncio.run(scenario())
+
+        assert manager.sessions == {}
+        assert manager.module_sessions[AppModule.MAIN_MENU] == set()
+        assert late_result['success'] is False
+
+
+class TestSwitchModule:
+    """Test module switching events"""
+
+    def test_switch_emits_leaving_joining_and_switched(self):
+        bus = EventBus()
+        received = []
+        for event_type in ('file_organizer_user_leaving', 'financial_manager_user_joining', 'module_switched'):
+            bus.subscribe(event_type, lambda data: received.append(data['event_type']))
+        manager = ClientManager(bus)
+
+        async def scenario():
+            await manager.handle_connect('sock1')
+            await manager.switch_module('sock1', 'file_organizer')
+            received.clear()
+            return await manager.switch_module('sock1', 'financial_manager')
+
+        result = asyncio.run(scenario())
+
+        assert result['old_module'] == 'file_organizer'
+        assert sorted(received) == [
+            'file_organizer_user_leaving', 'financial_manager_user_joining', 'module_switched'
+        ]
+
+    def test_switch_events_are_delivered_in_order(self):
+        bus = EventBus()
+        socketio = FakeSocketIO()
+        bus.set_socketio(socketio)
+        received = []
+
+        async def slow_leaving(data):
+            await asyncio.sleep(0.01)
+            received.append(data['event_type'])
+
+        bus.subscribe('file_organizer_user_leaving', slow_leaving)
+        for event_type in ('financial_manager_user_joining', 'module_switched'):
+            bus.subscribe(event_type, lambda data: received.append(data['event_type']))
+        manager = ClientManager(bus)
+
+        async def scenario():
+            await manager.handle_connect('sock1')
+            await manager.switch_module('sock1', 'file_organizer')
+            received.clear()
+            socketio.emitted.clear()
+            await manager.switch_module('sock1', 'financial_manager')
+
+        asyncio.run(scenario())
+
+        expected = ['file_organizer_user_leaving', 'financial_manager_user_joining', 'module_switched']
+        assert received == expected
+        assert [event for event, _ in socketio.emitted if event in expected] == expected
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the SQLite ConnectionPool
+"""
+
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.db_pool import ConnectionPool
+
+
+def make_pool(tmp_path, readers=2):
+    db_path = tmp_path / 'pool.db'
+    opened = []
+
+    def connect():
+        conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        opened.append(conn)
+        return conn
+
+    pool = ConnectionPool(connect, readers=readers)
+    with pool.write() as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    return pool, opened
+
+
+class TestConnectionPool:
+    """Test reader/writer checkout"""
+
+    def test_write_commits_and_read_sees_it(self, tmp_path):
+        pool, _ = make_pool(tmp_path)
+
+        with pool.write() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('a')")
+
+        with pool.read() as conn:
+            assert conn.execute("SELECT name FROM items").fetchall() == [('a',)]
+
+    def test_write_rolls_back_on_error(self, tmp_path):
+        pool, _ = make_pool(tmp_path)
+
+        with pytest.raises(RuntimeError):
+            with pool.write() as conn:
+                conn.execute("INSERT INTO items (name) VALUES ('a')")
+                raise RuntimeError('boom')
+
+        with pool.read() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone() == (0,)
+
+    def test_connections_are_reused(self, tmp_path):
+        pool, opened = make_pool(tmp_path)
+
+        for _ in range(5):
+            with pool.read() as conn:
+                conn.execute("SELECT 1")
+            with pool.write() as conn:
+                conn.execute("INSERT INTO items (name) VALUES ('a')")
+
+        # One writer plus a single reader (reads never overlapped)
+        assert len(opened) == 2
+
+    def test_readers_are_bounded(self, tmp_path):
+        pool, opened = make_pool(tmp_path, readers=2)
+        inside = threading.Barrier(3)
+        release = threading.Event()
+
+        def hold_reader():
+            with pool.read():
+                inside.wait()
+                release.wait()
+
+        holders = [threading.Thread(target=hold_reader) for _ in range(2)]
+        for holder in holders:
+            holder.start()
+        inside.wait()
+        waiter_done = threading.Event()
+
+        def third_reader():
+            with pool.read():
+                waiter_done.set()
+
+        waiter = threading.Thread(target=third_reader)
+        waiter.start()
+        assert not waiter_done.wait(0.05)
+        release.set()
+        waiter.join(timeout=1)
+        for holder in holders:
+            holder.join(timeout=1)
+
+        assert waiter_done.is_set()
+        assert len(opened) == 3  # writer + 2 readers
+
+    def test_close_closes_connections(self, tmp_path):
+        pool, opened = make_pool(tmp_path)
+        pool.close()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            opened[0].execute("SELECT 1")
+        with pytest.raises(RuntimeError):
+            with pool.read():
+                pass
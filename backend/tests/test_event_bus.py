@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Unit tests for EventBus
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.event_bus import EventBus
+
+
+class TestEmitMany:
+    """Test batched event emission"""
+
+    def test_emit_many_dispatches_each_event(self):
+        bus = EventBus()
+        received = []
+
+        async def on_async(data):
+            received.append(('async', data['event_type']))
+
+        def on_sync(data):
+            received.append(('sync', data['event_type']))
+
+        bus.subscribe('first', on_async, 'TestComponent')
+        bus.subscribe('second', on_sync, 'TestComponent')
+
+        asyncio.run(bus.emit_many([('first', {'n': 1}), ('second', {'n': 2})]))
+
+        assert sorted(received) == [('async', 'first'), ('sync', 'second')]
+
+    def test_emit_many_shares_timestamp(self):
+        bus = EventBus()
+        received = []
+        bus.subscribe('a', received.append)
+        bus.subscribe('b', received.append)
+
+        asyncio.run(bus.emit_many([('a', {}), ('b', {})]))
+
+        assert len(received) == 2
+        assert received[0]['timestamp'] == received[1]['timestamp']
+        assert all(data['source'] == 'backend' for data in received)
+
+    def test_emit_many_records_history(self):
+        bus = EventBus()
+
+        asyncio.run(bus.emit_many([('a', {'x': 1}), ('b', {})]))
+
+        history = bus.get_event_history()
+        assert [record['event_type'] for record in history] == ['a', 'b']
+
+    def test_emit_many_dispatches_in_order(self):
+        bus = EventBus()
+        received = []
+
+        async def slow(data):
+            await asyncio.sleep(0.01)
+            received.append(data['event_type'])
+
+        bus.subscribe('first', slow)
+        bus.subscribe('second', lambda data: received.append(data['event_type']))
+
+        asyncio.run(bus.emit_many([('first', {}), ('second', {})]))
+
+        assert received == ['first', 'second']
+
+    def test_emit_many_empty_is_noop(self):
+        bus = EventBus()
+        asyncio.run(bus.emit_many([]))
+        assert bus.get_event_history() == []
+
+
+class TestWildcardSubscriptions:
+    """Test trie-based wildcard routing"""
+
+    def test_multi_token_wildcard_matches_prefix(self):
+        bus = EventBus()
+        received = []
+        bus.subscribe('file_organizer_#', lambda data: received.append(data['event_type']))
+
+        async def scenario():
+            await bus.emit('file_organizer_user_joining', {})
+            await bus.emit('file_organizer_drive_status', {})
+            await bus.emit('financial_manager_user_joining', {})
+
+        asyncio.run(scenario())
+
+        assert received == ['file_organizer_user_joining', 'file_organizer_drive_status']
+
+    def test_single_token_wildcard(self):
+        bus = EventBus()
+        received = []
+        bus.subscribe('module_*', lambda data: received.append(data['event_type']))
+
+        async def scenario():
+            await bus.emit('module_started', {})
+            await bus.emit('module_start_requested', {})
+
+        asyncio.run(scenario())
+
+        assert received == ['module_started']
+
+    def test_exact_and_wildcard_subscribers_both_called(self):
+        bus = EventBus()
+        received = []
+        bus.subscribe('module_started', lambda data: received.append('exact'))
+        bus.subscribe('module_#', lambda data: received.append('wildcard'))
+
+        asyncio.run(bus.emit('module_started', {}))
+
+        assert received == ['exact', 'wildcard']
+
+    def test_unsubscribe_removes_wildcard_route(self):
+        bus = EventBus()
+        received = []
+        subscription_id = bus.subscribe('module_#', received.append)
+        bus.unsubscribe(subscription_id)
+
+        asyncio.run(bus.emit('module_started', {}))
+
+        assert received == []
+        assert bus.wildcard_trie.match('module_started') == []
+        assert 'module_#' not in bus.subscriptions
+
+
+class TestUnsubscribe:
+    """Test subscription removal"""
+
+    def test_unsubscribe_single_subscription(self):
+        bus = EventBus()
+        received = []
+        keep_id = bus.subscribe('evt', lambda data: received.append('keep'), 'A')
+        drop_id = bus.subscribe('evt', lambda data: received.append('drop'), 'A')
+        bus.unsubscribe(drop_id)
+
+        asyncio.run(bus.emit('evt', {}))
+
+        assert received == ['keep']
+        assert [sub.subscription_id for sub in bus.subscriptions['evt']] == [keep_id]
+
+    def test_unsubscribe_unknown_id_is_noop(self):
+        bus = EventBus()
+        bus.subscribe('evt', lambda data: None, 'A')
+        bus.unsubscribe('does-not-exist')
+        assert len(bus.subscriptions['evt']) == 1
+
+    def test_unsubscribe_component_removes_only_its_subscriptions(self):
+        bus = EventBus()
+        received = []
+        bus.subscribe('evt', lambda data: received.append('A'), 'A')
+        bus.subscribe('other', lambda data: received.append('A'), 'A')
+        bus.subscribe('evt', lambda data: received.append('B'), 'B')
+        bus.unsubscribe_component('A')
+
+        async def scenario():
+            await bus.emit('evt', {})
+            await bus.emit('other', {})
+
+        asyncio.run(scenario())
+
+        assert received == ['B']
+
+
+class TestEventHistory:
+    """Test bounded event history"""
+
+    def test_history_keeps_most_recent_records(self):
+        bus = EventBus()
+
+        async def scenario():
+            for index in range(bus.max_history + 5):
+                await bus.emit(f'evt_{index}', {})
+
+        asyncio.run(scenario())
+
+        assert len(bus.event_history) == bus.max_history
+        recent = bus.get_event_history(limit=2)
+        assert [record['event_type'] for record in recent] == [
+            f'evt_{bus.max_history + 3}', f'evt_{bus.max_history + 4}'
+        ]
+
+
+class TestInternalDispatch:
+    """Test internal subscriber dispatch"""
+
+    def test_async_subscribers_run_concurrently(self):
+        bus = EventBus()
+        order = []
+
+        async def slow(data):
+            order.append('slow_start')
+            await asyncio.sleep(0.01)
+            order.append('slow_end')
+
+        async def fast(data):
+            order.append('fast')
+
+        bus.subscribe('evt', slow)
+        bus.subscribe('evt', fast)
+
+        asyncio.run(bus.emit('evt', {}))
+
+        assert order == ['slow_start', 'fast', 'slow_end']
+
+    def test_failing_subscriber_does_not_block_others(self):
+        bus = EventBus()
+        received = []
+
+        async def broken(data):
+            raise RuntimeError('boom')
+
+        def also_broken(data):
+            raise RuntimeError('boom')
+
+        bus.subscribe('evt', broken)
+        bus.subscribe('evt', also_broken)
+        bus.subscribe('evt', received.append)
+
+        asyncio.run(bus.emit('evt', {}))
+
+        assert len(received) == 1
+
+    def test_subscribers_added_after_emit_are_dispatched(self):
+        bus = EventBus()
+        received = []
+
+        async def scenario():
+            await bus.emit('evt', {})
+            bus.subscribe('evt', received.append)
+            await bus.emit('evt', {})
+            bus.subscribe('#', received.append)
+            await bus.emit('evt', {})
+
+        asyncio.run(scenario())
+
+        assert len(received) == 3
+
+
+class TestUnobservedEvents:
+    """Test emits that have no subscribers or WebSocket clients"""
+
+    def test_unobserved_event_still_recorded(self):
+        bus = EventBus()
+
+        asyncio.run(bus.emit('nobody_listens', {'x': 1}))
+
+        record = bus.get_event_history()[-1]
+        assert record['event_type'] == 'nobody_listens'
+        assert record['data_keys'] == ['x', 'event_type', 'timestamp', 'source']
+        assert record['subscriber_count'] == 0
+
+    def test_history_can_be_disabled(self):
+        bus = EventBus()
+        bus.history_enabled = False
+        received = []
+        bus.subscribe('evt', received.append)
+
+        asyncio.run(bus.emit('evt', {}))
+
+        assert len(received) == 1
+        assert bus.get_event_history() == []
+
+
+class TestSubscriptionStats:
+    """Test subscription statistics"""
+
+    def test_stats_track_subscribe_and_unsubscribe(self):
+        bus = EventBus()
+        first = bus.subscribe('a', print, 'A')
+        bus.subscribe('a', print, 'B')
+        bus.subscribe('b', print, 'B')
+        bus.unsubscribe(first)
+
+        stats = bus.get_subscription_stats()
+
+        assert stats['total_subscriptions'] == 2
+        assert stats['components'] == ['B']
+        assert stats['events_by_type']['a'] == {'subscriber_count': 1}
+
+    def test_detailed_stats_list_components(self):
+        bus = EventBus()
+        bus.subscribe('a', print, 'A')
+
+        stats = bus.get_subscription_stats(detailed=True)
+
+        assert stats['events_by_type']['a']['components'] == ['A']
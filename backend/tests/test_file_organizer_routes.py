@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the file organizer routes
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip('flask')
+
+from core.routes.file_organizer_routes import _operation_groups
+
+
+class TestOperationGroups:
+    """Test grouping of legacy execute operations for parallel runs"""
+
+    def test_independent_operations_run_apart(self):
+        rows = [
+            ('move', '/src/a.txt', '/dest/Docs/a.txt'),
+            ('move', '/src/b.jpg', '/dest/Images/b.jpg'),
+        ]
+
+        assert _operation_groups(rows) == [[0], [1]]
+
+    def test_same_source_keeps_request_order(self):
+        rows = [
+            ('move', '/src/a.txt', '/dest/a.txt'),
+            ('move', '/src/b.txt', '/dest/b.txt'),
+            ('rename', '/src/a.txt', '/dest/renamed.txt'),
+        ]
+
+        assert _operation_groups(rows) == [[0, 2], [1]]
+
+    def test_chained_paths_share_a_group(self):
+        rows = [
+            ('move', '/src/a.txt', '/tmp/a.txt'),
+            ('rename', '/tmp/a.txt', '/dest/final.txt'),
+        ]
+
+        assert _operation_groups(rows) == [[0, 1]]
+
+    def test_nested_paths_share_a_group(self):
+        rows = [
+            ('unpack', '/src/photos.zip', '/dest/photos'),
+            ('move', '/dest/photos/img.jpg', '/dest/Images/img.jpg'),
+            ('move', '/dest/photos-old.jpg', '/dest/Old/photos-old.jpg'),
+        ]
+
+        assert _operation_groups(rows) == [[0, 1], [2]]
+
+    def test_equivalent_spellings_overlap(self):
+        rows = [
+            ('move', '/src/./a.txt', '/dest/a.txt'),
+            ('delete', '/src/a.txt', None),
+        ]
+
+        assert _operation_groups(rows) == [[0, 1]]
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the JSON codec
+"""
+
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import json_codec
+from core.json_codec import SocketIOJSON
+
+
+class TestJsonCodec:
+    """Test JSON encoding compatibility"""
+
+    def test_round_trip(self):
+        payload = {'success': True, 'items': [1, 2.5, None, 'ü'], 'nested': {'a': 'b'}}
+        assert json_codec.loads(json_codec.dumps(payload)) == payload
+
+    def test_output_matches_compact_stdlib_json(self):
+        payload = {'event_type': 'module_started', 'count': 3}
+        assert json.loads(json_codec.dumps(payload)) == payload
+        assert ' ' not in json_codec.dumps(payload)
+
+    def test_datetimes_encode_as_isoformat(self):
+        stamp = datetime(2024, 5, 1, 12, 30, 15, 250000)
+        assert json_codec.loads(json_codec.dumps({'at': stamp, 'none': None})) == {
+            'at': stamp.isoformat(), 'none': None
+        }
+
+    def test_dumps_bytes_matches_dumps(self):
+        payload = {'at': datetime(2024, 5, 1), 'name': 'ü', 'items': [1, None]}
+        encoded = json_codec.dumps_bytes(payload)
+        assert isinstance(encoded, bytes)
+        assert encoded == json_codec.dumps(payload).encode('utf-8')
+
+    def test_socketio_adapter_accepts_stdlib_arguments(self):
+        encoded = SocketIOJSON.dumps({'a': 1}, separators=(',', ':'))
+        assert isinstance(encoded, str)
+        assert SocketIOJSON.loads(encoded) == {'a': 1}
+
+
+class TestFlaskHelpers:
+    """Test the request/response helpers shared by the route modules"""
+
+    def test_request_json_returns_dict_or_empty(self):
+        flask = pytest.importorskip('flask')
+        app = flask.Flask(__name__)
+
+        for body, expected in ((b'{"a": 1}', {'a': 1}), (b'[1, 2]', {}), (b'not json', {}), (b'', {})):
+            with app.test_request_context(method='POST', data=body):
+                assert json_codec.request_json() == expected
+
+    def test_json_response_sets_status_and_mimetype(self):
+        flask = pytest.importorskip('flask')
+        app = flask.Flask(__name__)
+
+        with app.app_context():
+            response = json_codec.json_response({'success': False}, 404)
+
+        assert response.status_code == 404
+        assert response.mimetype == 'application/json'
+        assert json.loads(response.get_data()) == {'success': False}
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Unit tests for WebServer helpers
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip('flask_cors')
+pytest.importorskip('flask_socketio')
+
+from core.web_server import AI_BATCH_CHUNK_SIZE, WebServer
+
+
+class FakeBatchAnalyzer:
+    """Fails every chunk that contains failing_path, succeeds for the others"""
+
+    def __init__(self, failing_path):
+        self.failing_path = failing_path
+
+    def analyze_files_batch(self, file_paths, **kwargs):
+        if self.failing_path in file_paths:
+            return {'success': False, 'error': 'quota exceeded', 'error_details': {'type': 'quota'}}
+        return {'success': True, 'results': {path: {'content_type': 'document'} for path in file_paths}}
+
+
+def make_web_server(analyzer):
+    web_server = WebServer.__new__(WebServer)
+    web_server._get_ai_content_analyzer = lambda: analyzer
+    return web_server
+
+
+class TestBatchAnalyzeFiles:
+    """Test chunked AI batch analysis"""
+
+    def test_failed_chunk_keeps_its_error(self):
+        file_paths = [f"/files/{index}.pdf" for index in range(AI_BATCH_CHUNK_SIZE * 2)]
+        web_server = make_web_server(FakeBatchAnalyzer(failing_path=file_paths[-1]))
+
+        batch_result = web_server._batch_analyze_files(file_paths, use_ai=True, workers=2)
+
+        assert batch_result['success'] is True
+        results = batch_result['results']
+        for file_path in file_paths[:AI_BATCH_CHUNK_SIZE]:
+            assert results[file_path] == {'content_type': 'document', 'success': True}
+        for file_path in file_paths[AI_BATCH_CHUNK_SIZE:]:
+            assert results[file_path] == {
+                'success': False,
+                'error': 'quota exceeded',
+                'content_type': 'unknown',
+                'error_details': {'type': 'quota'}
+            }
+
+    def test_all_chunks_failing_fails_the_batch(self):
+        file_paths = [f"/files/{index}.pdf" for index in range(AI_BATCH_CHUNK_SIZE * 2)]
+        analyzer = FakeBatchAnalyzer(failing_path=None)
+        analyzer.analyze_files_batch = lambda file_paths, **kwargs: {'success': False, 'error': 'auth failed'}
+        web_server = make_web_server(analyzer)
+
+        batch_result = web_server._batch_analyze_files(file_paths, use_ai=True, workers=2)
+
+        assert batch_result['success'] is False
+        assert batch_result['error'] == 'auth failed'